@@ -0,0 +1,94 @@
+"""
+AWS Clients Module
+
+This module provides the boto3 clients and resources shared by the backend Lambda functions.
+All clients are built from a single boto3 session with TCP keep-alive, a larger connection
+pool and adaptive retries, and each one is created at most once per Lambda container.
+"""
+
+import boto3
+from botocore.config import Config
+from functools import lru_cache
+from typing import Any, Optional
+
+# Single session shared by every client in this container
+session = boto3.session.Session()
+
+# Default client configuration: keep-alive connections, a larger pool, adaptive retries
+default_config = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={'mode': 'adaptive', 'max_attempts': 10}
+)
+
+# S3 signs with SigV4 and uses virtual-hosted addressing, so presigned URLs need no
+# per-call signature or addressing-style resolution; short timeouts let a stalled
+# connection be retried instead of holding up the invocation
+s3_config = default_config.merge(Config(
+    signature_version='s3v4',
+    s3={'addressing_style': 'virtual'},
+    connect_timeout=2,
+    read_timeout=30
+))
+
+# Bedrock calls are long-running, so allow generous read timeouts
+bedrock_config = default_config.merge(Config(
+    connect_timeout=10,
+    read_timeout=300
+))
+
+# The segment summarization fan-out runs its own AIMD limiter, so its client keeps to a
+# single standard retry: throttling must reach the limiter instead of being absorbed here
+bedrock_fanout_config = bedrock_config.merge(Config(
+    retries={'mode': 'standard', 'max_attempts': 2}
+))
+
+
+@lru_cache(maxsize=None)
+def get_s3_client() -> Any:
+    """
+    Get the shared S3 client.
+
+    Returns:
+        boto3 S3 client
+    """
+    return session.client('s3', config=s3_config)
+
+
+@lru_cache(maxsize=None)
+def get_dynamodb_resource() -> Any:
+    """
+    Get the shared DynamoDB service resource.
+
+    Returns:
+        boto3 DynamoDB service resource
+    """
+    return session.resource('dynamodb', config=default_config)
+
+
+@lru_cache(maxsize=None)
+def get_bedrock_client(region_name: Optional[str] = None) -> Any:
+    """
+    Get the shared Bedrock runtime client for a region.
+
+    Args:
+        region_name: AWS region of the Bedrock endpoint (default: the Lambda's region)
+
+    Returns:
+        boto3 Bedrock runtime client
+    """
+    return session.client('bedrock-runtime', region_name=region_name, config=bedrock_config)
+
+
+@lru_cache(maxsize=None)
+def get_bedrock_fanout_client(region_name: Optional[str] = None) -> Any:
+    """
+    Get the low-retry Bedrock runtime client used by the segment summarization fan-out.
+
+    Args:
+        region_name: AWS region of the Bedrock endpoint (default: the Lambda's region)
+
+    Returns:
+        boto3 Bedrock runtime client
+    """
+    return session.client('bedrock-runtime', region_name=region_name, config=bedrock_fanout_config)
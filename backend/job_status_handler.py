@@ -8,20 +8,20 @@ Returns only the status field for a video processing job from the JobStatusTable
 import json
 import os
 import logging
-import boto3
 from typing import Any, Dict
+from aws_clients import get_dynamodb_resource
 
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
 
-dynamodb = boto3.resource("dynamodb")
+dynamodb = get_dynamodb_resource()
 JOB_STATUS_TABLE_NAME = os.environ.get("JOB_STATUS_TABLE_NAME")
 job_status_table = dynamodb.Table(JOB_STATUS_TABLE_NAME) if JOB_STATUS_TABLE_NAME else None
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     try:
-        logger.info(f"Received job status request: {json.dumps(event)}")
+        logger.debug("Received job status request: %s", event)
 
         # Extract jobId from path parameters
         path_params = event.get("pathParameters") or {}
@@ -6,23 +6,101 @@ It provides functions to create and update job status records in the DynamoDB ta
 """
 
 import os
-import boto3
+import time
 import logging
+from botocore.exceptions import ClientError
+from boto3.dynamodb.conditions import Key
 from typing import Dict, Any, List
 from datetime import datetime
+from decimal import Decimal
+from aws_clients import get_dynamodb_resource
 
 # Configure logging
 logger = logging.getLogger()
 if not logger.handlers:
-    logger.setLevel(logging.INFO)
+    logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 
 # Initialize DynamoDB client
-dynamodb = boto3.resource('dynamodb')
+dynamodb = get_dynamodb_resource()
 
 # Get table name from environment variable
 JOB_STATUS_TABLE_NAME = os.environ.get('JOB_STATUS_TABLE_NAME')
 job_status_table = dynamodb.Table(JOB_STATUS_TABLE_NAME) if JOB_STATUS_TABLE_NAME else None
 
+# Table of already-processed S3 upload events, used to drop redelivered notifications
+PROCESSED_EVENTS_TABLE_NAME = os.environ.get('PROCESSED_EVENTS_TABLE_NAME')
+processed_events_table = dynamodb.Table(PROCESSED_EVENTS_TABLE_NAME) if PROCESSED_EVENTS_TABLE_NAME else None
+
+# How long a processed-event marker is kept before DynamoDB TTL removes it
+PROCESSED_EVENT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# An 'in_progress' claim older than the processor's 15 minute timeout belongs to an
+# invocation that died mid-run, so a redelivered event may take it over
+PROCESSED_EVENT_STALE_SECONDS = 15 * 60
+
+# (jobId, eventKey) pairs this container has completed; a redelivery landing on the same
+# warm container is dropped without a DynamoDB round trip
+completed_events_cache = set()
+COMPLETED_EVENTS_CACHE_SIZE = 1000
+
+# GSI used to list recent jobs; every record shares one statusBucket value so the
+# index returns all jobs ordered by uploadTimestamp
+STATUS_BY_TIME_INDEX = 'StatusByTimeIndex'
+STATUS_BUCKET_ALL = 'ALL'
+
+
+def to_dynamodb_value(value: Any) -> Any:
+    """
+    Convert floats (including nested ones) to Decimal so the DynamoDB resource layer accepts them.
+    
+    Args:
+        value: Value to be written to DynamoDB
+        
+    Returns:
+        The value with every float replaced by an equivalent Decimal
+    """
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: to_dynamodb_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_dynamodb_value(v) for v in value]
+    return value
+
+
+def build_job_status_item(job_id: str, upload_timestamp: str, video_metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the initial job status item for a newly uploaded video.
+    
+    Args:
+        job_id: Analysis job ID
+        upload_timestamp: ISO timestamp when the video was uploaded
+        video_metadata: Video file metadata
+        
+    Returns:
+        DynamoDB item for the job status table
+    """
+    return {
+        'jobId': job_id,
+        'uploadTimestamp': upload_timestamp,
+        'status': 'pending',
+        'statusBucket': STATUS_BUCKET_ALL,
+        'videoFileName': video_metadata.get('filename', ''),
+        'videoS3Uri': video_metadata.get('s3_uri', ''),
+        'videoDuration': to_dynamodb_value(video_metadata.get('duration', 0)),
+        'videoSize': to_dynamodb_value(video_metadata.get('size', 0)),
+        'totalSegments': 0,
+        'processedSegments': 0,
+        'startTime': upload_timestamp,
+        'endTime': None,
+        'errorMessage': None,
+        'metadata': {
+            'resolution': video_metadata.get('resolution', 'unknown'),
+            'codec': video_metadata.get('video_codec', 'unknown'),
+            'contentType': video_metadata.get('content_type', 'unknown')
+        }
+    }
+
 
 def create_job_status_record(job_id: str, upload_timestamp: str, video_metadata: Dict[str, Any]) -> bool:
     """
@@ -41,35 +119,114 @@ def create_job_status_record(job_id: str, upload_timestamp: str, video_metadata:
         return False
     
     try:
-        item = {
-            'jobId': job_id,
-            'uploadTimestamp': upload_timestamp,
-            'status': 'pending',
-            'videoFileName': video_metadata.get('filename', ''),
-            'videoS3Uri': video_metadata.get('s3_uri', ''),
-            'videoDuration': video_metadata.get('duration', 0),
-            'videoSize': video_metadata.get('size', 0),
-            'totalSegments': 0,
-            'processedSegments': 0,
-            'startTime': upload_timestamp,
-            'endTime': None,
-            'errorMessage': None,
-            'metadata': {
-                'resolution': video_metadata.get('resolution', 'unknown'),
-                'codec': video_metadata.get('video_codec', 'unknown'),
-                'contentType': video_metadata.get('content_type', 'unknown')
-            }
-        }
-        
+        item = build_job_status_item(job_id, upload_timestamp, video_metadata)
         job_status_table.put_item(Item=item)
-        logger.info(f"✓ Created job status record for job {job_id}")
+        logger.info("✓ Created job status record for job %s", job_id)
         return True
         
     except Exception as e:
-        logger.error(f"Failed to create job status record for job {job_id}: {str(e)}")
+        logger.error("Failed to create job status record for job %s: %s", job_id, e)
         return False
 
 
+def claim_processing_event(job_id: str, event_key: str) -> bool:
+    """
+    Record that an upload event is being processed, unless it already was.
+    
+    S3 delivers notifications at least once, so the same event can arrive more than once.
+    A conditional put keyed by (jobId, eventKey) lets only the first delivery through. The
+    event key includes the event's sequencer, so re-uploading the same file is a new event
+    rather than a duplicate. A claim left 'in_progress' by an invocation that died can be
+    taken over once it is stale.
+    
+    Args:
+        job_id: Analysis job ID
+        event_key: Key identifying the S3 event (see processing_event_key)
+        
+    Returns:
+        False if the event was already claimed, True otherwise (including when
+        deduplication is not configured or the check itself fails)
+    """
+    if not processed_events_table or not event_key:
+        return True
+    
+    if (job_id, event_key) in completed_events_cache:
+        logger.info("Event for job %s (%s) was already processed", job_id, event_key)
+        return False
+    
+    now = int(time.time())
+    try:
+        processed_events_table.put_item(
+            Item={
+                'jobId': job_id,
+                'eventKey': event_key,
+                'status': 'in_progress',
+                'claimedAt': now,
+                'expiresAt': now + PROCESSED_EVENT_TTL_SECONDS
+            },
+            ConditionExpression='attribute_not_exists(eventKey) OR (#status = :in_progress AND claimedAt < :stale_before)',
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={
+                ':in_progress': 'in_progress',
+                ':stale_before': now - PROCESSED_EVENT_STALE_SECONDS
+            }
+        )
+        return True
+        
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+            logger.info("Event for job %s (%s) was already processed", job_id, event_key)
+            return False
+        logger.error("Failed to claim processing event for job %s: %s", job_id, e)
+        return True
+    except Exception as e:
+        # Connection and other client-side errors must not fail the whole batch either
+        logger.error("Failed to claim processing event for job %s: %s", job_id, e)
+        return True
+
+
+def complete_processing_event(job_id: str, event_key: str) -> None:
+    """
+    Mark a claimed upload event as done so later deliveries of it are skipped for good.
+    
+    Args:
+        job_id: Analysis job ID
+        event_key: Key identifying the S3 event (see processing_event_key)
+    """
+    if not processed_events_table or not event_key:
+        return
+    
+    try:
+        processed_events_table.update_item(
+            Key={'jobId': job_id, 'eventKey': event_key},
+            UpdateExpression='SET #status = :done',
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={':done': 'done'}
+        )
+        if len(completed_events_cache) >= COMPLETED_EVENTS_CACHE_SIZE:
+            completed_events_cache.clear()
+        completed_events_cache.add((job_id, event_key))
+    except Exception as e:
+        logger.error("Failed to complete processing event for job %s: %s", job_id, e)
+
+
+def release_processing_event(job_id: str, event_key: str) -> None:
+    """
+    Remove the claim on an upload event whose processing failed, so a redelivery can retry it.
+    
+    Args:
+        job_id: Analysis job ID
+        event_key: Key identifying the S3 event (see processing_event_key)
+    """
+    if not processed_events_table or not event_key:
+        return
+    
+    try:
+        processed_events_table.delete_item(Key={'jobId': job_id, 'eventKey': event_key})
+    except Exception as e:
+        logger.error("Failed to release processing event for job %s: %s", job_id, e)
+
+
 def update_job_status_record(job_id: str, upload_timestamp: str, status: str, 
                            update_data: Dict[str, Any] = None) -> bool:
     """
@@ -89,36 +246,38 @@ def update_job_status_record(job_id: str, upload_timestamp: str, status: str,
         return False
     
     try:
-        # Prepare update expression and attribute values
-        update_expression = "SET #status = :status, endTime = :end_time"
+        # Prepare update clauses and attribute values
+        set_clauses = ['#status = :status', 'endTime = :end_time']
         expression_attribute_names = {'#status': 'status'}
         expression_attribute_values = {
             ':status': status,
             ':end_time': datetime.utcnow().isoformat() + 'Z'
         }
-        
-        # Add optional update data
+
+        # Add optional update data; attribute names go through placeholders so
+        # DynamoDB reserved words are accepted as keys
         if update_data:
             for key, value in update_data.items():
                 safe_key = key.replace('.', '_').replace(' ', '_')
-                update_expression += f", {safe_key} = :{safe_key}"
-                expression_attribute_values[f":{safe_key}"] = value
-        
+                set_clauses.append(f"#{safe_key} = :{safe_key}")
+                expression_attribute_names[f"#{safe_key}"] = safe_key
+                expression_attribute_values[f":{safe_key}"] = to_dynamodb_value(value)
+
         job_status_table.update_item(
             Key={
                 'jobId': job_id,
                 'uploadTimestamp': upload_timestamp
             },
-            UpdateExpression=update_expression,
+            UpdateExpression='SET ' + ', '.join(set_clauses),
             ExpressionAttributeNames=expression_attribute_names,
             ExpressionAttributeValues=expression_attribute_values
         )
         
-        logger.info(f"✓ Updated job status record for job {job_id} to '{status}'")
+        logger.info("✓ Updated job status record for job %s to '%s'", job_id, status)
         return True
         
     except Exception as e:
-        logger.error(f"Failed to update job status record for job {job_id}: {str(e)}")
+        logger.error("Failed to update job status record for job %s: %s", job_id, e)
         return False
 
 
@@ -147,20 +306,20 @@ def get_job_status_record(job_id: str, upload_timestamp: str) -> Dict[str, Any]:
         
         item = response.get('Item', {})
         if item:
-            logger.info(f"✓ Retrieved job status record for job {job_id}")
+            logger.info("✓ Retrieved job status record for job %s", job_id)
         else:
-            logger.warning(f"Job status record not found for job {job_id}")
+            logger.warning("Job status record not found for job %s", job_id)
             
         return item
         
     except Exception as e:
-        logger.error(f"Failed to retrieve job status record for job {job_id}: {str(e)}")
+        logger.error("Failed to retrieve job status record for job %s: %s", job_id, e)
         return {}
 
 
 def list_job_status_records(limit: int = 50) -> List[Dict[str, Any]]:
     """
-    List recent job status records from DynamoDB.
+    List recent job status records from DynamoDB, most recent first.
     
     Args:
         limit: Maximum number of records to return (default: 50)
@@ -173,16 +332,19 @@ def list_job_status_records(limit: int = 50) -> List[Dict[str, Any]]:
         return []
     
     try:
-        response = job_status_table.scan(
+        response = job_status_table.query(
+            IndexName=STATUS_BY_TIME_INDEX,
+            KeyConditionExpression=Key('statusBucket').eq(STATUS_BUCKET_ALL),
+            ScanIndexForward=False,  # latest first
             Limit=limit,
             ProjectionExpression='jobId, uploadTimestamp, #status, videoFileName, videoDuration, startTime, endTime',
             ExpressionAttributeNames={'#status': 'status'}
         )
         
         items = response.get('Items', [])
-        logger.info(f"✓ Retrieved {len(items)} job status records")
+        logger.info("✓ Retrieved %s job status records", len(items))
         return items
         
     except Exception as e:
-        logger.error(f"Failed to list job status records: {str(e)}")
+        logger.error("Failed to list job status records: %s", e)
         return []
\ No newline at end of file
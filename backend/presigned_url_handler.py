@@ -1,16 +1,24 @@
 import json
-import boto3
 import os
+import re
 from botocore.exceptions import ClientError
 from typing import Dict, Any
 import logging
+from aws_clients import get_s3_client
 
 # Configure logging
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 
 # Initialize S3 client
-s3_client = boto3.client('s3')
+s3_client = get_s3_client()
+
+# jobId format (alphanumeric, dashes, underscores only)
+JOB_ID_PATTERN = re.compile(r'^[a-zA-Z0-9_-]+\Z')
+
+# Allowed video file extensions for upload
+ALLOWED_EXTENSIONS = frozenset({'.mp4', '.mov', '.avi', '.mkv', '.webm'})
+ALLOWED_EXTENSIONS_LIST = ', '.join(sorted(ALLOWED_EXTENSIONS))
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
@@ -72,16 +80,14 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             raise ValueError("jobId is required in request body")
         
         # Validate jobId format (alphanumeric, dashes, underscores only)
-        import re
-        if not re.match(r'^[a-zA-Z0-9_-]+$', job_id):
+        if not JOB_ID_PATTERN.match(job_id):
             raise ValueError("jobId must contain only alphanumeric characters, dashes, and underscores")
         
         # Validate file extension for security
-        allowed_extensions = ['.mp4', '.mov', '.avi', '.mkv', '.webm']
         file_extension = os.path.splitext(filename.lower())[1]
         
-        if file_extension not in allowed_extensions:
-            raise ValueError(f"File type {file_extension} not allowed. Supported types: {', '.join(allowed_extensions)}")
+        if file_extension not in ALLOWED_EXTENSIONS:
+            raise ValueError(f"File type {file_extension} not allowed. Supported types: {ALLOWED_EXTENSIONS_LIST}")
         
         # Generate S3 key with jobId/original directory structure
         s3_key = f"videos/{job_id}/original/{filename}"
@@ -98,7 +104,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             ExpiresIn=3600  # URL expires in 1 hour
         )
         
-        logger.info(f"Generated presigned URL for key: {s3_key}")
+        logger.info("Generated presigned URL for key: %s", s3_key)
         
         # Return success response
         response_body = {
@@ -115,7 +121,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         }
         
     except ValueError as e:
-        logger.error(f"Validation error: {str(e)}")
+        logger.error("Validation error: %s", e)
         return {
             'statusCode': 400,
             'headers': headers,
@@ -126,7 +132,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         }
         
     except ClientError as e:
-        logger.error(f"AWS error: {str(e)}")
+        logger.error("AWS error: %s", e)
         return {
             'statusCode': 500,
             'headers': headers,
@@ -148,7 +154,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         }
         
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
+        logger.error("Unexpected error: %s", e)
         return {
             'statusCode': 500,
             'headers': headers,
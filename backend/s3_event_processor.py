@@ -1,51 +1,206 @@
+import heapq
 import json
-import boto3
+import mimetypes
+import random
+import re
 import subprocess
-import shlex
 import os
 import tempfile
+import threading
 import time
+from datetime import datetime, timezone
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from botocore.exceptions import ClientError
-from typing import Dict, Any, List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 from urllib.parse import unquote_plus
-from summarize import summarize_clip
-from job_status_update import create_job_status_record, update_job_status_record
+from boto3.s3.transfer import TransferConfig
+from aws_clients import get_s3_client, get_bedrock_fanout_client
+from summarize import summarize_clip, BEDROCK_REGION
+from job_status_update import (
+    create_job_status_record, update_job_status_record,
+    claim_processing_event, complete_processing_event, release_processing_event
+)
 from segment_caption_update import save_batch_segment_captions
 
 # Configure logging
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 
-# Initialize AWS clients
-s3_client = boto3.client('s3')
-
-# FFmpeg path in Lambda layer
+# FFmpeg and FFprobe paths in Lambda layer
 FFMPEG_PATH = '/opt/bin/ffmpeg'
+FFPROBE_PATH = '/opt/bin/ffprobe'
+
+# Checked once at load: the layer cannot appear or vanish while the container lives
+FFMPEG_LAYER_AVAILABLE = os.path.exists(FFMPEG_PATH) and os.path.exists(FFPROBE_PATH)
+
+# Lifetime of the presigned URLs FFprobe and FFmpeg read the upload through; covers
+# the processor's 15 minute timeout so a long segmentation run never sees it expire
+SOURCE_URL_EXPIRY_SECONDS = 15 * 60
+
+
+def warm_ffmpeg() -> None:
+    """
+    Run the FFmpeg and FFprobe binaries once so their pages are cached before the first upload.
+    
+    Both are large static binaries on the layer mount; loading them during Lambda init
+    takes the first-read cost out of the first probe and segmentation run.
+    """
+    for binary_path in (FFPROBE_PATH, FFMPEG_PATH):
+        try:
+            subprocess.run([binary_path, '-version'], stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, timeout=5)
+        except Exception as e:
+            logger.debug("Warm-up run of %s failed: %s", binary_path, e)
+
+
+# Warm the binaries during Lambda init, ahead of the first event
+if FFMPEG_LAYER_AVAILABLE and os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+    warm_ffmpeg()
 
 # Get bucket names from environment variables
 SEGMENTS_BUCKET_NAME = os.environ.get('SEGMENTS_BUCKET_NAME')
 
+# Only uploaded originals are processed: videos/{jobId}/original/{filename}
+ORIGINAL_VIDEO_KEY_PATTERN = re.compile(r'videos/(?P<job_id>[^/\s]+)/original/(?P<filename>[^/]+\.[^/.]+)')
+
+# Content types for supported video extensions; object metadata is never fetched
+# from S3, everything else comes from the event record
+VIDEO_CONTENT_TYPES = {
+    '.mp4': 'video/mp4',
+    '.avi': 'video/x-msvideo',
+    '.mov': 'video/quicktime',
+    '.mkv': 'video/x-matroska',
+    '.webm': 'video/webm',
+    '.flv': 'video/x-flv',
+    '.wmv': 'video/x-ms-wmv',
+    '.m4v': 'video/x-m4v'
+}
+
+# Longest video processed inline; longer ones cannot be segmented and summarized within
+# the FFmpeg and Lambda timeouts, so they are rejected up front instead of timing out
+MAX_VIDEO_DURATION_SECONDS = int(os.environ.get('MAX_VIDEO_DURATION_SECONDS', '600'))
+
+# Maximum number of uploads from one event processed at the same time. The deployed SQS
+# source delivers one upload per invocation (batchSize 1), so this only matters for
+# direct S3 events carrying several records
+MAX_CONCURRENT_UPLOADS = 4
+
+# Concurrent segment uploads per video; even with MAX_CONCURRENT_UPLOADS videos in flight
+# (direct S3 events only) this stays within the shared S3 client's 50-connection pool
+MAX_SEGMENT_UPLOAD_WORKERS = 10
+
+# Limit for the whole FFmpeg segmentation run
+SEGMENTATION_TIMEOUT_SECONDS = 300
+
+# Segment encoding trades quality for throughput: segments are only read by the Nova
+# model and never shown to people. x264 runs at the ultrafast preset with CRF 28 (about
+# half the size of CRF 23; visible events still caption the same) and fastdecode tuning
+# (no CABAC or deblocking, so decoding on the model side is cheaper), on all Lambda vCPUs.
+# GOP length follows the segment length so every segment starts on a keyframe
+
+# Transfer settings for segment uploads: segments are already uploaded in parallel, so
+# typical 5 second clips go in a single PUT and only unusually large ones are split,
+# with few parts each to keep the connection pool from being oversubscribed
+SEGMENT_UPLOAD_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=2
+)
+
+# Adaptive (AIMD) concurrency settings for Bedrock summarization
+BEDROCK_MIN_CONCURRENCY = 1
+BEDROCK_MAX_CONCURRENCY = int(os.environ.get('BEDROCK_MAX_CONCURRENCY', '16'))
+BEDROCK_TARGET_LATENCY_SECONDS = float(os.environ.get('BEDROCK_TARGET_LATENCY_SECONDS', '10'))
+BEDROCK_LATENCY_WINDOW = 20
+BEDROCK_MAX_THROTTLE_RETRIES = 3
+BEDROCK_THROTTLE_BACKOFF_BASE_SECONDS = 1.0
+BEDROCK_THROTTLE_BACKOFF_MAX_SECONDS = 20.0
+THROTTLING_ERROR_CODES = {'ThrottlingException', 'TooManyRequestsException', 'ServiceUnavailableException'}
+
+# Worker pool for Bedrock calls, created once per container and reused across
+# warm invocations. Its size is the global cap on in-flight Bedrock calls for all
+# videos processed at once; each video's AIMD limit only decides how many of its
+# segments it queues here
+bedrock_executor = ThreadPoolExecutor(max_workers=BEDROCK_MAX_CONCURRENCY, thread_name_prefix='bedrock')
+
+
+def unwrap_s3_records(event: Dict[str, Any]) -> List[Tuple[Optional[str], Dict[str, Any]]]:
+    """
+    Collect the S3 event records from a direct S3 notification or from SQS messages wrapping one.
+    
+    Args:
+        event: S3 event notification, or SQS event whose message bodies are S3 notifications
+        
+    Returns:
+        List of (SQS message ID, S3 event record) pairs; the message ID is None for
+        records delivered directly by S3
+    """
+    records = []
+    for record in event.get('Records', []):
+        if record.get('eventSource') == 'aws:sqs':
+            # S3 test events and other non-notification messages carry no Records
+            body = json.loads(record.get('body') or '{}')
+            records.extend((record.get('messageId'), s3_record) for s3_record in body.get('Records', []))
+        else:
+            records.append((None, record))
+    return records
+
+
+def sqs_message_ids(event: Dict[str, Any]) -> List[str]:
+    """
+    Get the IDs of the SQS messages in an event.
+    
+    Args:
+        event: Lambda event
+        
+    Returns:
+        List of SQS message IDs (empty for a direct S3 event notification)
+    """
+    return [record['messageId'] for record in event.get('Records', [])
+            if record.get('eventSource') == 'aws:sqs' and record.get('messageId')]
+
+
+def processing_event_key(s3_object: Dict[str, Any]) -> str:
+    """
+    Build the key used to deduplicate an S3 upload event.
+    
+    The ETag only identifies the file contents, so re-uploading the same file to a job
+    would look like a duplicate. The sequencer (and the versionId on versioned buckets)
+    is unique per object event and repeated by a redelivered notification.
+    
+    Args:
+        s3_object: The 'object' entry of an S3 event record
+        
+    Returns:
+        Event key, or an empty string if the record has no ETag (no deduplication)
+    """
+    etag = s3_object.get('eTag', '')
+    if not etag:
+        return ''
+    return ':'.join(part for part in (etag, s3_object.get('versionId'), s3_object.get('sequencer')) if part)
+
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     AWS Lambda function to process S3 upload events.
     
-    This function is triggered when files are uploaded to the S3 bucket
-    and performs processing on the uploaded video files.
+    This function is triggered when files are uploaded to the S3 bucket, with the
+    S3 notifications buffered through the upload SQS queue, and performs processing
+    on the uploaded video files.
     
     Args:
-        event: S3 event notification containing bucket and object information
+        event: SQS event wrapping S3 event notifications (or a direct S3 event notification)
         context: Lambda context object
         
     Returns:
-        Dict containing processing status and results
+        Dict containing processing status and results, with the SQS messages to
+        redeliver listed under batchItemFailures
     """
     
     try:
-        logger.info(f"Received S3 event: {json.dumps(event, indent=2)}")
+        logger.debug("Received S3 event: %s", event)
         logger.info("=== S3 Event Processor - Processing Rules ===")
         logger.info("✓ ONLY process files matching: videos/{jobId}/original/{filename}")
         logger.info("✗ SKIP files matching: videos/{jobId}/segments/{filename}")
@@ -54,108 +209,166 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         logger.info("✗ SKIP files matching: videos/{jobId}/previews/{filename}")
         logger.info("=== End Processing Rules ===")
         
-        # Process each record in the S3 event
-        processed_files = []
+        # Without the FFmpeg layer every upload would fail deep inside processing
+        if not FFMPEG_LAYER_AVAILABLE:
+            logger.error("FFmpeg layer missing: %s or %s not found", FFMPEG_PATH, FFPROBE_PATH)
+            return {
+                'statusCode': 500,
+                'body': {
+                    'error': 'FFmpeg layer missing',
+                    'message': 'Failed to process S3 event'
+                },
+                'batchItemFailures': [{'itemIdentifier': message_id} for message_id in sqs_message_ids(event)]
+            }
         
-        for record in event.get('Records', []):
+        # Filter the records in the S3 event down to the uploads to process
+        uploads = []
+        upload_message_ids = []
+        upload_event_keys = []
+        
+        for message_id, record in unwrap_s3_records(event):
             # Extract S3 bucket and object information
             s3_info = record.get('s3', {})
             bucket_name = s3_info.get('bucket', {}).get('name')
             object_key = unquote_plus(s3_info.get('object', {}).get('key', ''))
             object_size = s3_info.get('object', {}).get('size', 0)
+            object_etag = s3_info.get('object', {}).get('eTag', '')
             event_name = record.get('eventName', '')
+            event_time = record.get('eventTime')
             
             if not bucket_name or not object_key:
-                logger.warning(f"Invalid S3 event record: {record}")
-                continue
-            
-            logger.info(f"Processing S3 event: {event_name} for {bucket_name}/{object_key}")
-            
-            # Only process video files in the videos/ prefix
-            if not object_key.startswith('videos/'):
-                logger.info(f"Skipping non-video file (not in videos/ prefix): {object_key}")
-                continue
-            
-            # Extract job ID from the S3 key path
-            # Expected format: videos/{jobId}/original/{filename}
-            # Do NOT process: videos/{jobId}/segments/{filename} or videos/{jobId}/thumbnails/{filename}
-            path_parts = object_key.split('/')
-            if len(path_parts) < 4:
-                logger.warning(f"Unexpected S3 key format (insufficient path parts): {object_key}")
-                logger.warning(f"Expected format: videos/{{jobId}}/original/{{filename}}, got {len(path_parts)} parts: {path_parts}")
+                logger.warning("Invalid S3 event record: %s", record)
                 continue
             
-            # Ensure we have exactly the expected structure
-            if len(path_parts) != 4:
-                logger.warning(f"Unexpected S3 key format (too many path parts): {object_key}")
-                logger.warning(f"Expected format: videos/{{jobId}}/original/{{filename}}, got {len(path_parts)} parts: {path_parts}")
-                continue
-            
-            job_id = path_parts[1]
-            file_category = path_parts[2]  # Should be 'original'
-            filename = path_parts[3]
-            
-            # Validate job_id is not empty
-            if not job_id or job_id.strip() == '':
-                logger.warning(f"Invalid job_id in S3 key: {object_key}")
-                continue
-            
-            # Validate filename is not empty and has an extension
-            if not filename or filename.strip() == '' or '.' not in filename:
-                logger.warning(f"Invalid filename in S3 key: {object_key}")
-                continue
+            logger.info("Processing S3 event: %s for %s/%s", event_name, bucket_name, object_key)
             
-            # CRITICAL: Only process files in the 'original' directory to avoid infinite loops
-            # This prevents reprocessing of:
+            # CRITICAL: Only process files matching videos/{jobId}/original/{filename} to
+            # avoid infinite loops; this skips everything the pipeline writes itself:
             # - segments: videos/{jobId}/segments/{filename}
-            # - thumbnails: videos/{jobId}/thumbnails/{filename}  
+            # - thumbnails: videos/{jobId}/thumbnails/{filename}
             # - metadata: videos/{jobId}/metadata/{filename}
             # - previews: videos/{jobId}/previews/{filename}
-            if file_category != 'original':
-                logger.info(f"Skipping non-original file (category: '{file_category}'): {object_key}")
-                logger.info("Only processing files in 'videos/{jobId}/original/' directory")
+            key_match = ORIGINAL_VIDEO_KEY_PATTERN.fullmatch(object_key)
+            if not key_match:
+                logger.info("Skipping file outside videos/{jobId}/original/: %s", object_key)
                 continue
             
+            job_id, filename = key_match.group('job_id', 'filename')
+            
             # Additional safety check: ensure we're processing a video file
-            video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.webm', '.flv', '.wmv', '.m4v']
-            if not any(filename.lower().endswith(ext) for ext in video_extensions):
-                logger.info(f"Skipping non-video file (extension check): {object_key}")
+            if os.path.splitext(filename.lower())[1] not in VIDEO_CONTENT_TYPES:
+                logger.info("Skipping non-video file (extension check): %s", object_key)
                 continue
             
-            logger.info(f"✓ Processing original video file: {filename} (job_id: {job_id})")
+            # Skip redelivered notifications for an upload that was already processed
+            event_key = processing_event_key(s3_info.get('object', {}))
+            if not claim_processing_event(job_id, event_key):
+                logger.info("Skipping duplicate S3 event for %s", object_key)
+                continue
             
-            # Process the uploaded video file
-            processing_result = process_video_upload(
-                bucket_name=bucket_name,
-                object_key=object_key,
-                job_id=job_id,
-                filename=filename,
-                file_size=object_size
-            )
+            logger.info("✓ Processing original video file: %s (job_id: %s)", filename, job_id)
             
-            processed_files.append(processing_result)
+            uploads.append({
+                'bucket_name': bucket_name,
+                'object_key': object_key,
+                'job_id': job_id,
+                'filename': filename,
+                'file_size': object_size,
+                'etag': object_etag,
+                'event_time': event_time
+            })
+            upload_message_ids.append(message_id)
+            upload_event_keys.append(event_key)
+        
+        # Process the uploaded video files. Via SQS (batchSize 1) there is a single upload;
+        # direct S3 events may carry several, which run concurrently since each one mostly
+        # waits on S3 transfers, FFmpeg subprocesses and Bedrock calls
+        processed_files = []
+        if uploads:
+            with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_UPLOADS, len(uploads))) as executor:
+                processed_files = list(executor.map(process_claimed_upload, uploads, upload_event_keys))
+        
+        # Hand messages whose upload failed back to SQS: they are retried after the
+        # visibility timeout and end up in the DLQ once maxReceiveCount is reached
+        failed_message_ids = {
+            message_id for message_id, result in zip(upload_message_ids, processed_files)
+            if message_id and result.get('status') == 'error'
+        }
         
         return {
             'statusCode': 200,
             'body': {
                 'message': f'Successfully processed {len(processed_files)} files',
                 'processedFiles': processed_files
-            }
+            },
+            'batchItemFailures': [{'itemIdentifier': message_id} for message_id in sorted(failed_message_ids)]
         }
         
     except Exception as e:
-        logger.error(f"Error processing S3 event: {str(e)}")
+        logger.error("Error processing S3 event: %s", e)
         return {
             'statusCode': 500,
             'body': {
                 'error': str(e),
                 'message': 'Failed to process S3 event'
-            }
+            },
+            'batchItemFailures': [{'itemIdentifier': message_id} for message_id in sqs_message_ids(event)]
         }
 
 
+def process_claimed_upload(upload: Dict[str, Any], event_key: str) -> Dict[str, Any]:
+    """
+    Process an upload whose event was claimed, then settle the claim.
+    
+    Args:
+        upload: Keyword arguments for process_video_upload
+        event_key: Key the upload event was claimed under
+        
+    Returns:
+        Dict containing processing results
+    """
+    processing_result = process_video_upload(**upload)
+    
+    if processing_result.get('status') == 'error':
+        # Unexpected failure: let a redelivered event retry the upload
+        release_processing_event(upload['job_id'], event_key)
+    else:
+        complete_processing_event(upload['job_id'], event_key)
+    
+    return processing_result
+
+
+def normalize_upload_timestamp(event_time: Optional[str] = None) -> str:
+    """
+    Format the upload time the way job status sort keys have always been written.
+    
+    Keys used to come from the object's LastModified.isoformat(), e.g.
+    '2024-05-01T12:34:56+00:00'. S3 event times look like '2024-05-01T12:34:56.789Z',
+    so they are re-emitted in the same UTC, second-precision form to keep old and new
+    records sorting together.
+    
+    Args:
+        event_time: ISO timestamp of the S3 event record (default: now)
+        
+    Returns:
+        Upload timestamp string used as the job status sort key
+    """
+    upload_time = None
+    if event_time:
+        try:
+            upload_time = datetime.fromisoformat(event_time.replace('Z', '+00:00'))
+        except ValueError:
+            logger.warning("Unparseable S3 event time %s, using the current time", event_time)
+    if upload_time is None:
+        upload_time = datetime.now(timezone.utc)
+    elif upload_time.tzinfo is None:
+        upload_time = upload_time.replace(tzinfo=timezone.utc)
+    return upload_time.astimezone(timezone.utc).replace(microsecond=0).isoformat()
+
+
 def process_video_upload(bucket_name: str, object_key: str, job_id: str, 
-                        filename: str, file_size: int) -> Dict[str, Any]:
+                        filename: str, file_size: int, etag: str = '',
+                        event_time: str = None) -> Dict[str, Any]:
     """
     Process an uploaded video file.
     
@@ -165,32 +378,28 @@ def process_video_upload(bucket_name: str, object_key: str, job_id: str,
         job_id: Analysis job ID
         filename: Original filename
         file_size: File size in bytes
+        etag: Object ETag from the S3 event record
+        event_time: ISO timestamp of the S3 event record
         
     Returns:
         Dict containing processing results
     """
     
     try:
-        logger.info(f"Processing video upload: {bucket_name}/{object_key}")
-        
-        # Get file metadata from S3
-        try:
-            response = s3_client.head_object(Bucket=bucket_name, Key=object_key)
-            last_modified = response.get('LastModified')
-            content_type = response.get('ContentType', 'unknown')
-            etag = response.get('ETag', '').strip('"')
-            
-            logger.info(f"File metadata - Size: {file_size}, Type: {content_type}, ETag: {etag}")
-            
-        except ClientError as e:
-            logger.error(f"Failed to get object metadata: {str(e)}")
-            raise
+        logger.info("Processing video upload: %s/%s", bucket_name, object_key)
+        
+        # Everything needed is carried by the S3 event record; the content type
+        # follows from the file extension
+        content_type = (
+            VIDEO_CONTENT_TYPES.get(os.path.splitext(filename.lower())[1])
+            or mimetypes.guess_type(filename)[0]
+            or 'unknown'
+        )
+        etag = etag.strip('"')
+        logger.info("File metadata - Size: %s, Type: %s, ETag: %s", file_size, content_type, etag)
         
         # Create upload timestamp for job tracking
-        upload_timestamp = last_modified.isoformat() if last_modified else None
-        if not upload_timestamp:
-            from datetime import datetime
-            upload_timestamp = datetime.utcnow().isoformat() + 'Z'
+        upload_timestamp = normalize_upload_timestamp(event_time)
         
         # Create initial job status record
         initial_metadata = {
@@ -208,12 +417,25 @@ def process_video_upload(bucket_name: str, object_key: str, job_id: str,
         # TODO: Implement video processing logic
         # This is where you would add your video processing steps:
         
-        # Step 1: Validate video file format and integrity
-        logger.info("Step 1: Validating video file format and integrity...")
-        validation_result = validate_video_file(bucket_name, object_key)
+        # Step 1: Validate video file format and integrity and extract its metadata
+        # in a single ffprobe pass; a file ffprobe cannot read is invalid
+        logger.info("Step 1: Validating video file and extracting metadata with FFprobe...")
+        metadata = probe_video(bucket_name, object_key)
+        
+        if metadata.get('error'):
+            validation_result = {
+                'valid': False,
+                'error': metadata['error'],
+                'message': metadata.get('message', 'Video file validation failed')
+            }
+        else:
+            validation_result = {
+                'valid': True,
+                'message': 'Video file is valid and readable by FFprobe'
+            }
         
         if not validation_result.get('valid', False):
-            logger.error(f"Video validation failed: {validation_result.get('message', 'Unknown error')}")
+            logger.error("Video validation failed: %s", validation_result.get('message', 'Unknown error'))
             
             # Update job status to failed
             update_job_status_record(job_id, upload_timestamp, 'failed', {
@@ -229,29 +451,30 @@ def process_video_upload(bucket_name: str, object_key: str, job_id: str,
                 'validation': validation_result
             }
         
-        logger.info(f"Video validation successful: {validation_result.get('message', 'Valid')}")
+        logger.info("Video validation successful: %s", validation_result.get('message', 'Valid'))
         
         # TODO: 2. Generate video thumbnails
         # - Extract key frames from the video
         # - Generate thumbnail images at different timestamps
         # - Store thumbnails in S3 under videos/{jobId}/thumbnails/
         
-        # Step 3: Extract video metadata using FFmpeg
-        logger.info("Step 3: Extracting video metadata using FFmpeg...")
-        metadata = extract_metadata(bucket_name, object_key)
+        # Step 3: Video metadata was extracted by the FFprobe pass in Step 1
+        
+        # Log the full metadata only when debugging; the summary is logged at the end
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Video metadata: %s", json.dumps(metadata))
         
-        # Print metadata output instead of storing
-        logger.info("=== Video Metadata ===")
-        logger.info(json.dumps(metadata, indent=2))
-        logger.info("=== End Metadata ===")
+        # Summarize the probed metadata once for the job record and the processing result
+        file_info = metadata.get('file_info') or {}
+        video_info = metadata.get('video_info') or {}
+        audio_info = metadata.get('audio_info') or {}
+        video_duration = file_info.get('duration', 0)
+        resolution = f"{video_info.get('width', 0)}x{video_info.get('height', 0)}" if video_info else 'unknown'
+        video_codec = video_info.get('codec_name') or 'unknown'
+        audio_codec = audio_info.get('codec_name') or 'unknown'
         
         # Update job status with video metadata
         if not metadata.get('error'):
-            video_duration = metadata.get('file_info', {}).get('duration', 0)
-            video_info = metadata.get('video_info', {})
-            resolution = f"{video_info.get('width', 0)}x{video_info.get('height', 0)}" if video_info else 'unknown'
-            video_codec = video_info.get('codec_name', 'unknown') if video_info else 'unknown'
-            
             update_job_status_record(job_id, upload_timestamp, 'pending', {
                 'videoDuration': video_duration,
                 'metadata': {
@@ -261,17 +484,33 @@ def process_video_upload(bucket_name: str, object_key: str, job_id: str,
                 }
             })
         
+        # Fail long videos before any FFmpeg work rather than timing out mid-segmentation
+        if video_duration > MAX_VIDEO_DURATION_SECONDS:
+            error_message = f"Video is {video_duration:.0f}s long, the limit is {MAX_VIDEO_DURATION_SECONDS}s"
+            logger.error("Rejecting %s: %s", object_key, error_message)
+            update_job_status_record(job_id, upload_timestamp, 'failed', {
+                'errorMessage': error_message
+            })
+            return {
+                'jobId': job_id,
+                'filename': filename,
+                'objectKey': object_key,
+                'status': 'rejected',
+                'error': error_message
+            }
+        
         # Step 4: Split video into segments using FFmpeg's native segmentation
         logger.info("Step 4: Splitting video into segments using FFmpeg's native segmentation...")
-        segment_result = split_video_into_segments(bucket_name, object_key, job_id)
+        segment_result = split_video_into_segments(bucket_name, object_key, job_id, video_duration,
+                                                   video_info.get('fps') or 0)
         
         if segment_result.get('error'):
-            logger.error(f"Video splitting failed: {segment_result.get('error')}")
+            logger.error("Video splitting failed: %s", segment_result.get('error'))
             update_job_status_record(job_id, upload_timestamp, 'failed', {
                 'error': f"Video splitting failed: {segment_result.get('error')}"
             })
         else:
-            logger.info(f"Successfully created {len(segment_result.get('segments', []))} video segments")
+            logger.info("Successfully created %s video segments", len(segment_result.get('segments', [])))
             # Update job status with segment count
             update_job_status_record(job_id, upload_timestamp, 'pending', {
                 'totalSegments': len(segment_result.get('segments', [])),
@@ -290,15 +529,15 @@ def process_video_upload(bucket_name: str, object_key: str, job_id: str,
             )
             
             if summarization_result.get('success'):
-                logger.info(f"Successfully summarized {summarization_result.get('successful_segments', 0)}/{summarization_result.get('total_segments', 0)} segments")
+                logger.info("Successfully summarized %s/%s segments", summarization_result.get('successful_segments', 0), summarization_result.get('total_segments', 0))
                 # Update job status to done with final results
                 update_job_status_record(job_id, upload_timestamp, 'done', {
                     'processedSegments': summarization_result.get('successful_segments', 0),
                     'summarizationResults': summarization_result.get('results', []),
-                    'completedAt': int(time.time() * 1000)
+                    'completedAt': time.time_ns() // 1_000_000
                 })
             else:
-                logger.error(f"Video summarization failed: {summarization_result.get('error', 'Unknown error')}")
+                logger.error("Video summarization failed: %s", summarization_result.get('error', 'Unknown error'))
                 update_job_status_record(job_id, upload_timestamp, 'failed', {
                     'error': f"Video summarization failed: {summarization_result.get('error', 'Unknown error')}"
                 })
@@ -311,7 +550,7 @@ def process_video_upload(bucket_name: str, object_key: str, job_id: str,
                 # No segments but no error - mark as done
                 update_job_status_record(job_id, upload_timestamp, 'done', {
                     'processedSegments': 0,
-                    'completedAt': int(time.time() * 1000),
+                    'completedAt': time.time_ns() // 1_000_000,
                     'note': 'No segments to process'
                 })
         
@@ -338,7 +577,7 @@ def process_video_upload(bucket_name: str, object_key: str, job_id: str,
         logger.info("✓ 2. Video metadata extraction with FFmpeg")
         logger.info("✓ 3. Metadata logged to CloudWatch")
         logger.info("✓ 4. Video split into segments")
-        logger.info(f"✓ 5. Video summarization using Bedrock Nova ({'successful' if summarization_result.get('success') else 'failed'})")
+        logger.info("✓ 5. Video summarization using Bedrock Nova (%s)", 'successful' if summarization_result.get('success') else 'failed')
         logger.info("TODO: 6. Generate video thumbnails")
         logger.info("TODO: 7. Generate preview clips")
         logger.info("TODO: 8. Update job status")
@@ -353,12 +592,12 @@ def process_video_upload(bucket_name: str, object_key: str, job_id: str,
             'contentType': content_type,
             'etag': etag,
             'status': 'processed',
-            'timestamp': last_modified.isoformat() if last_modified else None,
+            'timestamp': upload_timestamp,
             'metadata': {
-                'duration': metadata.get('file_info', {}).get('duration', 0) if 'file_info' in metadata else 0,
-                'resolution': f"{metadata.get('video_info', {}).get('width', 0)}x{metadata.get('video_info', {}).get('height', 0)}" if metadata.get('video_info') else 'unknown',
-                'video_codec': metadata.get('video_info', {}).get('codec_name', 'unknown') if metadata.get('video_info') else 'unknown',
-                'audio_codec': metadata.get('audio_info', {}).get('codec_name', 'unknown') if metadata.get('audio_info') else 'unknown',
+                'duration': video_duration,
+                'resolution': resolution,
+                'video_codec': video_codec,
+                'audio_codec': audio_codec,
                 'has_error': 'error' in metadata
             },
             'segmentation': {
@@ -391,18 +630,18 @@ def process_video_upload(bucket_name: str, object_key: str, job_id: str,
             ]
         }
         
-        logger.info(f"Processing completed for {object_key}")
+        logger.info("Processing completed for %s", object_key)
         if not metadata.get('error'):
-            logger.info(f"Video metadata: {processing_result['metadata']['duration']:.2f}s, {processing_result['metadata']['resolution']}, {processing_result['metadata']['video_codec']}")
+            logger.info("Video metadata: %.2fs, %s, %s", video_duration, resolution, video_codec)
         if not segment_result.get('error'):
-            logger.info(f"Video segmentation: {segment_result.get('uploaded_segments', 0)}/{segment_result.get('total_segments', 0)} segments uploaded")
+            logger.info("Video segmentation: %s/%s segments uploaded", segment_result.get('uploaded_segments', 0), segment_result.get('total_segments', 0))
         if summarization_result.get('success'):
-            logger.info(f"Video summarization: {summarization_result.get('successful_segments', 0)}/{summarization_result.get('total_segments', 0)} segments summarized")
+            logger.info("Video summarization: %s/%s segments summarized", summarization_result.get('successful_segments', 0), summarization_result.get('total_segments', 0))
         
         return processing_result
         
     except Exception as e:
-        logger.error(f"Error processing video upload {object_key}: {str(e)}")
+        logger.error("Error processing video upload %s: %s", object_key, e)
         
         # Update job status to failed on any unhandled exception
         try:
@@ -410,7 +649,7 @@ def process_video_upload(bucket_name: str, object_key: str, job_id: str,
                 'error': f"Unexpected error: {str(e)}"
             })
         except Exception as status_error:
-            logger.error(f"Failed to update job status after error: {status_error}")
+            logger.error("Failed to update job status after error: %s", status_error)
         
         return {
             'jobId': job_id,
@@ -421,435 +660,300 @@ def process_video_upload(bucket_name: str, object_key: str, job_id: str,
         }
 
 
-def validate_video_file(bucket_name: str, object_key: str) -> Dict[str, Any]:
+def get_source_url(bucket_name: str, object_key: str) -> str:
     """
-    Validate video file format and integrity using FFmpeg.
+    Presign a GET URL for an uploaded video so FFprobe/FFmpeg can read it over HTTP.
     
     Args:
         bucket_name: S3 bucket name
         object_key: S3 object key
         
     Returns:
-        Dict containing validation results
+        Presigned URL valid for SOURCE_URL_EXPIRY_SECONDS
     """
-    try:
-        logger.info(f"Validating video file: {bucket_name}/{object_key}")
-        
-        # Download file to /tmp for FFprobe analysis
-        local_file_path = f"/tmp/{object_key.split('/')[-1]}"
-        
-        try:
-            s3_client.download_file(bucket_name, object_key, local_file_path)
-            logger.info(f"Downloaded {object_key} to {local_file_path}")
-        except Exception as e:
-            logger.error(f"Failed to download file: {str(e)}")
-            return {
-                'valid': False,
-                'error': str(e),
-                'message': 'Failed to download file for validation'
-            }
-        
-        # Simple FFmpeg command to validate the file by attempting to read it
-        # If FFmpeg can read the file without errors, it's likely a valid video
-        ffmpeg_cmd = f'{FFMPEG_PATH} -v error -i "{local_file_path}" -t 1 -f null -'
-        command = shlex.split(ffmpeg_cmd)
-        
-        logger.info("Running FFmpeg validation...")
-        
-        # Execute FFmpeg for validation
-        result = subprocess.run(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=30  # 30 second timeout for validation
-        )
-        
-        # Clean up temporary file
-        try:
-            subprocess.run(['rm', '-f', local_file_path], check=False)
-        except Exception:
-            pass  # Ignore cleanup errors
-        
-        if result.returncode == 0:
-            logger.info("Video validation successful")
-            return {
-                'valid': True,
-                'message': 'Video file is valid and readable by FFmpeg'
-            }
-        else:
-            logger.error(f"Video validation failed: {result.stderr}")
-            return {
-                'valid': False,
-                'error': result.stderr,
-                'message': 'Video file validation failed'
-            }
-            
-    except subprocess.TimeoutExpired:
-        logger.error(f"Video validation timeout for {object_key}")
-        return {
-            'valid': False,
-            'error': 'Validation timeout',
-            'message': 'Video validation timed out'
-        }
-    except Exception as e:
-        logger.error(f"Error validating video file {object_key}: {str(e)}")
-        return {
-            'valid': False,
-            'error': str(e),
-            'message': 'Video validation error'
-        }
+    return get_s3_client().generate_presigned_url(
+        'get_object',
+        Params={'Bucket': bucket_name, 'Key': object_key},
+        ExpiresIn=SOURCE_URL_EXPIRY_SECONDS
+    )
 
 
-def generate_thumbnails(bucket_name: str, object_key: str, job_id: str) -> List[str]:
+def probe_video(bucket_name: str, object_key: str) -> Dict[str, Any]:
     """
-    TODO: Generate thumbnails from video file.
+    Validate a video file and extract its metadata with a single FFprobe call.
     
-    Args:
-        bucket_name: S3 bucket name
-        object_key: S3 object key
-        job_id: Analysis job ID
-        
-    Returns:
-        List of S3 keys for generated thumbnails
-    """
-    # TODO: Implement thumbnail generation
-    # - Extract frames at specific intervals
-    # - Resize to standard thumbnail sizes
-    # - Upload to S3 under videos/{jobId}/thumbnails/
-    pass
-
-
-def extract_metadata(bucket_name: str, object_key: str) -> Dict[str, Any]:
-    """
-    Extract video metadata using FFmpeg.
+    Validation only checks that the container parses and has a video stream; no
+    frames are decoded. FFprobe reads the object through a presigned URL and issues HTTP range requests,
+    so only the container header (e.g. the MP4 moov atom, at either end of the file)
+    is transferred instead of the whole video.
     
     Args:
         bucket_name: S3 bucket name
         object_key: S3 object key
         
     Returns:
-        Dict containing video metadata
+        Dict containing video metadata, or an 'error' entry if FFprobe cannot read the file
     """
     try:
-        logger.info(f"Extracting metadata for {bucket_name}/{object_key}")
-        
-        # Download file to /tmp for FFprobe analysis
-        local_file_path = f"/tmp/{object_key.split('/')[-1]}"
-        
-        try:
-            s3_client.download_file(bucket_name, object_key, local_file_path)
-            logger.info(f"Downloaded {object_key} to {local_file_path}")
-        except Exception as e:
-            logger.error(f"Failed to download file: {str(e)}")
-            return {'error': f'Failed to download file: {str(e)}'}
-        
-        # FFmpeg command to extract metadata
-        # Use -f null to avoid creating output, just analyze the input
-        ffmpeg_cmd = f'{FFMPEG_PATH} -i "{local_file_path}" -f null -'
-        command = shlex.split(ffmpeg_cmd)
+        logger.info("Probing video file %s/%s with FFprobe...", bucket_name, object_key)
         
-        logger.info("Running FFmpeg for metadata extraction...")
+        probe_url = get_source_url(bucket_name, object_key)
         
-        # Execute FFmpeg (metadata goes to stderr)
         result = subprocess.run(
-            command,
+            [FFPROBE_PATH, '-v', 'error', '-print_format', 'json',
+             '-show_error', '-show_format', '-show_streams', probe_url],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
-            timeout=60  # 1 minute timeout
+            timeout=60  # 1 minute timeout for probing
         )
         
-        # Clean up temporary file
         try:
-            subprocess.run(['rm', '-f', local_file_path], check=False)
-        except Exception:
-            pass  # Ignore cleanup errors
-        
-        # FFmpeg outputs metadata to stderr, even on success
-        # We'll parse the text output instead of JSON
-        metadata_text = result.stderr
-        
-        if result.returncode not in [0, 1]:  # FFmpeg returns 1 when using -f null, but still provides metadata
-            logger.error(f"FFmpeg failed with return code {result.returncode}")
-            logger.error(f"FFmpeg stderr: {result.stderr}")
+            probe_data = json.loads(result.stdout) if result.stdout else {}
+        except json.JSONDecodeError:
+            probe_data = {}
+        
+        # -show_error reports open/parse failures as a JSON 'error' object
+        probe_error = probe_data.get('error', {}).get('string')
+        if result.returncode != 0 or probe_error:
+            # FFprobe echoes its input in stderr; keep the signed URL out of logs and job status
+            stderr = result.stderr.replace(probe_url, f"s3://{bucket_name}/{object_key}").strip()
+            error = probe_error or stderr or f'FFprobe failed with return code {result.returncode}'
+            logger.error("FFprobe failed with return code %s: %s", result.returncode, error)
             return {
-                'error': f'FFmpeg failed: {result.stderr}',
-                'returncode': result.returncode
+                'error': error,
+                'message': 'Video file validation failed'
             }
         
-        # Parse FFmpeg output to extract metadata
-        extracted_metadata = parse_ffmpeg_output(metadata_text, object_key)
-        return extracted_metadata
+        format_info = probe_data.get('format', {})
+        streams = probe_data.get('streams', [])
+        video_stream = next((st for st in streams if st.get('codec_type') == 'video'), None)
+        audio_stream = next((st for st in streams if st.get('codec_type') == 'audio'), None)
         
-    except subprocess.TimeoutExpired:
-        logger.error(f"FFmpeg timeout for {object_key}")
-        return {'error': 'FFmpeg timeout', 'timeout': True}
-    except Exception as e:
-        logger.error(f"Error extracting metadata for {object_key}: {str(e)}")
-        return {'error': str(e)}
-
-
-def parse_ffmpeg_output(metadata_text: str, object_key: str) -> Dict[str, Any]:
-    """
-    Parse FFmpeg text output to extract video metadata.
-    
-    Args:
-        metadata_text: FFmpeg stderr output containing metadata
-        object_key: S3 object key for filename reference
+        if not video_stream:
+            logger.error("No video stream found in %s", object_key)
+            return {
+                'error': 'No video stream found',
+                'message': 'Video file validation failed'
+            }
         
-    Returns:
-        Dict containing parsed metadata
-    """
-    import re
-    
-    try:
-        logger.info("Parsing FFmpeg metadata output...")
+        # Frame rate is reported as a fraction, e.g. "30000/1001"
+        numerator, _, denominator = video_stream.get('avg_frame_rate', '0/1').partition('/')
+        try:
+            fps = float(numerator) / float(denominator or 1)
+        except (ValueError, ZeroDivisionError):
+            fps = 0
         
-        # Initialize metadata structure
         extracted_metadata = {
             'file_info': {
                 'filename': object_key,
-                'format_name': None,
-                'duration': 0.0,
-                'size': 0,
-                'bit_rate': 0
+                'format_name': format_info.get('format_name'),
+                'duration': float(format_info.get('duration', 0) or 0),
+                'size': int(format_info.get('size', 0) or 0),
+                'bit_rate': int(format_info.get('bit_rate', 0) or 0)
             },
-            'video_info': None,
-            'audio_info': None,
-            'raw_output': metadata_text
+            'video_info': {
+                'codec_name': video_stream.get('codec_name'),
+                'width': int(video_stream.get('width', 0)),
+                'height': int(video_stream.get('height', 0)),
+                'fps': round(fps, 2),
+                'pix_fmt': video_stream.get('pix_fmt')
+            },
+            'audio_info': None
         }
         
-        # Parse duration (format: Duration: HH:MM:SS.ss)
-        duration_match = re.search(r'Duration: (\d{2}):(\d{2}):(\d{2})\.(\d{2})', metadata_text)
-        if duration_match:
-            hours, minutes, seconds, centiseconds = map(int, duration_match.groups())
-            total_seconds = hours * 3600 + minutes * 60 + seconds + centiseconds / 100
-            extracted_metadata['file_info']['duration'] = total_seconds
-        
-        # Parse bitrate (format: bitrate: XXXX kb/s)
-        bitrate_match = re.search(r'bitrate: (\d+) kb/s', metadata_text)
-        if bitrate_match:
-            extracted_metadata['file_info']['bit_rate'] = int(bitrate_match.group(1)) * 1000  # Convert to bps
-        
-        # Parse container format
-        format_match = re.search(r'Input #0, ([^,]+)', metadata_text)
-        if format_match:
-            extracted_metadata['file_info']['format_name'] = format_match.group(1)
-        
-        # Parse video stream info (format: Stream #0:0: Video: codec, format, WIDTHxHEIGHT, fps)
-        video_match = re.search(r'Stream #\d+:\d+.*Video: ([^,]+)(?:,\s*([^,]+))?(?:,\s*(\d+)x(\d+))?.*?(\d+(?:\.\d+)?) fps', metadata_text)
-        if video_match:
-            codec = video_match.group(1)
-            pixel_format = video_match.group(2) if video_match.group(2) else None
-            width = int(video_match.group(3)) if video_match.group(3) else 0
-            height = int(video_match.group(4)) if video_match.group(4) else 0
-            fps = float(video_match.group(5)) if video_match.group(5) else 0
-            
-            extracted_metadata['video_info'] = {
-                'codec_name': codec,
-                'width': width,
-                'height': height,
-                'fps': fps,
-                'pix_fmt': pixel_format
-            }
-        
-        # Parse audio stream info (format: Stream #0:1: Audio: codec, sample_rate Hz, channels)
-        audio_match = re.search(r'Stream #\d+:\d+.*Audio: ([^,]+)(?:,\s*(\d+) Hz)?(?:,\s*([^,]+))?', metadata_text)
-        if audio_match:
-            codec = audio_match.group(1)
-            sample_rate = int(audio_match.group(2)) if audio_match.group(2) else 0
-            channels_info = audio_match.group(3) if audio_match.group(3) else None
-            
-            # Extract channel count from channel info (e.g., "stereo", "mono", "5.1")
-            channels = 0
-            if channels_info:
-                if 'stereo' in channels_info.lower():
-                    channels = 2
-                elif 'mono' in channels_info.lower():
-                    channels = 1
-                elif '5.1' in channels_info:
-                    channels = 6
-                else:
-                    # Try to extract number from string
-                    channel_match = re.search(r'(\d+)', channels_info)
-                    if channel_match:
-                        channels = int(channel_match.group(1))
-            
+        if audio_stream:
             extracted_metadata['audio_info'] = {
-                'codec_name': codec,
-                'sample_rate': sample_rate,
-                'channels': channels,
-                'channel_layout': channels_info
+                'codec_name': audio_stream.get('codec_name'),
+                'sample_rate': int(audio_stream.get('sample_rate', 0) or 0),
+                'channels': int(audio_stream.get('channels', 0)),
+                'channel_layout': audio_stream.get('channel_layout')
             }
         
-        logger.info(f"Successfully parsed FFmpeg metadata for {object_key}")
-        logger.info(f"Video duration: {extracted_metadata['file_info']['duration']} seconds")
-        if extracted_metadata['video_info']:
-            logger.info(f"Video resolution: {extracted_metadata['video_info']['width']}x{extracted_metadata['video_info']['height']}")
+        logger.info("Successfully probed %s", object_key)
+        logger.info("Video duration: %s seconds", extracted_metadata['file_info']['duration'])
+        logger.info("Video resolution: %sx%s", extracted_metadata['video_info']['width'], extracted_metadata['video_info']['height'])
         if extracted_metadata['audio_info']:
-            logger.info(f"Audio: {extracted_metadata['audio_info']['sample_rate']}Hz, {extracted_metadata['audio_info']['channels']} channels")
+            logger.info("Audio: %sHz, %s channels", extracted_metadata['audio_info']['sample_rate'], extracted_metadata['audio_info']['channels'])
         
         return extracted_metadata
         
+    except subprocess.TimeoutExpired:
+        logger.error("FFprobe timeout for %s", object_key)
+        return {
+            'error': 'Validation timeout',
+            'message': 'Video validation timed out',
+            'timeout': True
+        }
     except Exception as e:
-        logger.error(f"Error parsing FFmpeg output: {str(e)}")
+        logger.error("Error probing video file %s: %s", object_key, e)
         return {
-            'error': f'Failed to parse FFmpeg output: {str(e)}',
-            'raw_output': metadata_text
+            'error': str(e),
+            'message': 'Video validation error'
         }
 
 
-def split_video_into_segments(bucket_name: str, object_key: str, job_id: str, segment_duration: int = 5) -> Dict[str, Any]:
+def generate_thumbnails(bucket_name: str, object_key: str, job_id: str) -> List[str]:
+    """
+    TODO: Generate thumbnails from video file.
+    
+    Args:
+        bucket_name: S3 bucket name
+        object_key: S3 object key
+        job_id: Analysis job ID
+        
+    Returns:
+        List of S3 keys for generated thumbnails
+    """
+    # TODO: Implement thumbnail generation
+    # - Extract frames at specific intervals
+    # - Resize to standard thumbnail sizes
+    # - Upload to S3 under videos/{jobId}/thumbnails/
+    pass
+
+
+def split_video_into_segments(bucket_name: str, object_key: str, job_id: str, video_duration: float,
+                              video_fps: float = 0, segment_duration: int = 5) -> Dict[str, Any]:
     """
     Split video into segments using FFmpeg's native segmentation and upload to S3 segments bucket.
     
+    FFmpeg reads the original through a presigned URL rather than a downloaded copy, so
+    encoding starts as soon as the first bytes arrive and the original never lands in /tmp.
+    
     Args:
         bucket_name: S3 bucket name containing the original video
         object_key: S3 object key of the original video
         job_id: Analysis job ID
+        video_duration: Duration of the video in seconds, as probed by probe_video
+        video_fps: Average frame rate of the video, as probed by probe_video (0 if unknown)
         segment_duration: Duration of each segment in seconds (default: 5)
         
     Returns:
         Dict containing segmentation results with segments uploaded to the dedicated segments bucket
     """
     try:
-        logger.info(f"Starting video segmentation for {bucket_name}/{object_key}")
+        logger.info("Starting video segmentation for %s/%s", bucket_name, object_key)
         
         with tempfile.TemporaryDirectory() as temp_dir:
-            # Download video to temporary directory
-            filename = Path(object_key).name
-            local_video_path = os.path.join(temp_dir, filename)
+            source_uri = f"s3://{bucket_name}/{object_key}"
+            source_url = get_source_url(bucket_name, object_key)
             
-            try:
-                s3_client.download_file(bucket_name, object_key, local_video_path)
-                logger.info(f"Downloaded video to {local_video_path}")
-            except Exception as e:
-                logger.error(f"Failed to download video: {str(e)}")
-                return {'error': f'Failed to download video: {str(e)}'}
-            
-            # Get video duration first
-            duration = get_video_duration_ffmpeg(local_video_path)
-            if duration <= 0:
+            if video_duration <= 0:
                 logger.error("Could not determine video duration")
                 return {'error': 'Could not determine video duration'}
             
             # Calculate expected number of segments
-            num_segments = int(duration / segment_duration) + (1 if duration % segment_duration > 0 else 0)
-            logger.info(f"Video duration: {duration:.2f}s, expecting ~{num_segments} segments of {segment_duration}s each")
+            num_segments = int(video_duration / segment_duration) + (1 if video_duration % segment_duration > 0 else 0)
+            logger.info("Video duration: %.2fs, expecting ~%s segments of %ss each", video_duration, num_segments, segment_duration)
             
             # Create segments directory
             segments_dir = os.path.join(temp_dir, "segments")
             os.makedirs(segments_dir, exist_ok=True)
             
+            # Get segments bucket name from environment
+            segments_bucket = SEGMENTS_BUCKET_NAME
+            if not segments_bucket:
+                logger.error("SEGMENTS_BUCKET_NAME environment variable not set")
+                return {'error': 'Segments bucket not configured'}
+            
             # Use FFmpeg's segment muxer for efficient video splitting
             segment_pattern = os.path.join(segments_dir, "%d.mp4")
             
+            # One GOP per segment: a keyframe is forced at every segment boundary and
+            # none are needed in between (30 fps assumed if the frame rate is unknown)
+            gop_size = str(max(1, round(segment_duration * (video_fps or 30))))
+            
             # FFmpeg command using segment muxer with optimized settings
             ffmpeg_cmd = [
                 FFMPEG_PATH,
-                '-i', local_video_path,
+                # Resume the HTTPS read if the connection to S3 drops mid-stream
+                '-reconnect', '1',
+                '-reconnect_on_network_error', '1',
+                '-reconnect_delay_max', '5',
+                '-i', source_url,
                 '-c:v', 'libx264',  # Video codec
                 '-preset', 'ultrafast',  # Fastest encoding preset for Lambda
-                '-crf', '23',  # Good quality compression
-                '-g', '30',  # GOP size for consistent keyframes
-                '-keyint_min', '30',  # Minimum keyframe interval
+                '-tune', 'fastdecode',  # Cheaper to decode on the model side
+                '-crf', '28',  # Segments are only read by the model; favour size over quality
+                '-threads', '0',  # Use every available vCPU
+                '-force_key_frames', f'expr:gte(t,n_forced*{segment_duration})',  # Keyframe at each segment start
+                '-g', gop_size,  # GOP size matching the segment length
+                '-keyint_min', gop_size,  # Minimum keyframe interval
                 '-sc_threshold', '0',  # Disable scene change detection
                 '-f', 'segment',  # Use segment muxer
                 '-segment_time', str(segment_duration),  # Segment duration
+                '-segment_list', 'pipe:1',  # Print each segment's filename once it is complete
+                '-segment_list_type', 'flat',
                 '-reset_timestamps', '1',  # Reset timestamps for each segment
-                '-movflags', '+faststart',  # Move metadata to beginning for faster loading
                 '-an',  # Remove audio (not needed for video analysis)
                 '-y',  # Overwrite output files
                 segment_pattern
             ]
             
-            logger.info(f"Running FFmpeg segmentation: {' '.join(ffmpeg_cmd)}")
-            
-            # Run FFmpeg segmentation
-            result = subprocess.run(
-                ffmpeg_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=300  # 5 minute timeout for entire segmentation
-            )
+            # Log the command with the S3 URI in place of the signed URL
+            logger.info("Running FFmpeg segmentation: %s", ' '.join(ffmpeg_cmd).replace(source_url, source_uri))
             
-            if result.returncode != 0:
-                logger.error(f"FFmpeg segmentation failed: {result.stderr}")
-                return {'error': f'FFmpeg segmentation failed: {result.stderr}'}
-            
-            # Debug: List all files created in segments directory
-            try:
-                all_files = os.listdir(segments_dir)
-                logger.info(f"Files in segments directory after FFmpeg: {all_files}")
-            except Exception as e:
-                logger.error(f"Could not list segments directory: {str(e)}")
-            
-            # Find all created segment files
             segment_files = []
-            for file in os.listdir(segments_dir):
-                if file.endswith('.mp4') and file[:-4].isdigit():
-                    segment_files.append(os.path.join(segments_dir, file))
-            
-            # Sort by segment number
-            segment_files.sort(key=lambda x: int(Path(x).stem))
-            
-            if not segment_files:
-                logger.error("No segments were created by FFmpeg")
-                return {'error': 'No segments were created by FFmpeg'}
-            
-            logger.info(f"FFmpeg created {len(segment_files)} segments: {[Path(f).name for f in segment_files]}")
-            
-            logger.info(f"Successfully created {len(segment_files)} segments, uploading to S3...")
-            
-            # Validate all segment files exist before uploading
-            missing_files = []
-            for segment_path in segment_files:
-                if not os.path.exists(segment_path):
-                    missing_files.append(Path(segment_path).name)
-            
-            if missing_files:
-                logger.error(f"Missing segment files before upload: {missing_files}")
-                return {'error': f'Missing segment files: {missing_files}'}
-            
-            # Upload segments to S3 segments bucket with concurrent uploads
             uploaded_segments = []
-            upload_tasks = []
-            
-            # Get segments bucket name from environment
-            segments_bucket = SEGMENTS_BUCKET_NAME
-            if not segments_bucket:
-                logger.error("SEGMENTS_BUCKET_NAME environment variable not set")
-                return {'error': 'Segments bucket not configured'}
             
-            for segment_path in segment_files:
-                segment_filename = Path(segment_path).name
-                segment_key = f"videos/{job_id}/segments/{segment_filename}"
-                upload_tasks.append((segment_path, segments_bucket, segment_key))
-            
-            # Use ThreadPoolExecutor for concurrent uploads
-            max_workers = min(5, len(upload_tasks))  # Limit concurrent uploads in Lambda
-            
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all upload tasks
-                future_to_task = {
-                    executor.submit(upload_segment_to_s3, task): task 
-                    for task in upload_tasks
-                }
+            # FFmpeg's log goes to a file: nothing reads stderr while segments are
+            # uploading, and a full pipe would stall FFmpeg
+            with open(os.path.join(temp_dir, 'ffmpeg.log'), 'w+') as ffmpeg_log, \
+                    ThreadPoolExecutor(max_workers=MAX_SEGMENT_UPLOAD_WORKERS) as executor:
+                process = subprocess.Popen(ffmpeg_cmd, stdout=subprocess.PIPE, stderr=ffmpeg_log, text=True)
+                watchdog = threading.Timer(SEGMENTATION_TIMEOUT_SECONDS, process.kill)
+                watchdog.start()
+                
+                # Upload each segment as soon as FFmpeg reports it, while the
+                # following segments are still being encoded
+                future_to_task = {}
+                try:
+                    for line in process.stdout:
+                        segment_filename = line.strip()
+                        if not segment_filename:
+                            continue
+                        segment_path = os.path.join(segments_dir, segment_filename)
+                        segment_key = f"videos/{job_id}/segments/{segment_filename}"
+                        task = (segment_path, segments_bucket, segment_key)
+                        segment_files.append(segment_path)
+                        future_to_task[executor.submit(upload_segment_to_s3, task)] = task
+                    process.wait()
+                finally:
+                    timed_out = watchdog.finished.is_set()
+                    watchdog.cancel()
+                    if process.poll() is None:
+                        process.kill()
+                        process.wait()
+                    process.stdout.close()
+                
+                if timed_out or process.returncode != 0:
+                    # Stop uploading segments of a failed run
+                    executor.shutdown(cancel_futures=True)
+                    if timed_out:
+                        raise subprocess.TimeoutExpired(FFMPEG_PATH, SEGMENTATION_TIMEOUT_SECONDS)
+                    
+                    # FFmpeg echoes its input in stderr; keep the signed URL out of logs and job status
+                    ffmpeg_log.seek(0)
+                    stderr = ffmpeg_log.read().replace(source_url, source_uri)
+                    logger.error("FFmpeg segmentation failed: %s", stderr)
+                    return {'error': f'FFmpeg segmentation failed: {stderr}'}
+                
+                if not segment_files:
+                    logger.error("No segments were created by FFmpeg")
+                    return {'error': 'No segments were created by FFmpeg'}
+                
+                logger.info("FFmpeg created %s segments", len(segment_files))
                 
                 # Collect results as they complete
                 for future in as_completed(future_to_task):
                     try:
-                        s3_url = future.result()
-                        uploaded_segments.append(s3_url)
-                        logger.info(f"✓ Uploaded: {Path(s3_url).name}")
+                        uploaded_segments.append(future.result())
                     except Exception as e:
                         task = future_to_task[future]
-                        logger.error(f"✗ Upload failed for {Path(task[0]).name}: {str(e)}")
+                        logger.error("✗ Upload failed for %s: %s", Path(task[0]).name, e)
                         # Continue with other uploads even if one fails
             
-            logger.info(f"Segmentation completed: {len(uploaded_segments)}/{len(segment_files)} segments uploaded successfully")
+            logger.info("Segmentation completed: %s/%s segments uploaded successfully", len(uploaded_segments), len(segment_files))
             
             return {
                 'success': True,
@@ -857,55 +961,17 @@ def split_video_into_segments(bucket_name: str, object_key: str, job_id: str, se
                 'total_segments': len(segment_files),
                 'uploaded_segments': len(uploaded_segments),
                 'segment_duration': segment_duration,
-                'video_duration': duration
+                'video_duration': video_duration
             }
             
     except subprocess.TimeoutExpired:
-        logger.error(f"Video segmentation timeout for {object_key}")
+        logger.error("Video segmentation timeout for %s", object_key)
         return {'error': 'Video segmentation timeout'}
     except Exception as e:
-        logger.error(f"Error splitting video {object_key}: {str(e)}")
+        logger.error("Error splitting video %s: %s", object_key, e)
         return {'error': str(e)}
 
 
-def get_video_duration_ffmpeg(video_path: str) -> float:
-    """
-    Get video duration using FFmpeg.
-    
-    Args:
-        video_path: Local path to video file
-        
-    Returns:
-        Duration in seconds, or 0 if failed
-    """
-    try:
-        # Use FFmpeg to get duration (output goes to stderr)
-        ffmpeg_cmd = [FFMPEG_PATH, '-i', video_path, '-f', 'null', '-']
-        
-        result = subprocess.run(
-            ffmpeg_cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=30
-        )
-        
-        # Parse duration from stderr output
-        import re
-        duration_match = re.search(r'Duration: (\d{2}):(\d{2}):(\d{2})\.(\d{2})', result.stderr)
-        if duration_match:
-            hours, minutes, seconds, centiseconds = map(int, duration_match.groups())
-            total_seconds = hours * 3600 + minutes * 60 + seconds + centiseconds / 100
-            return total_seconds
-        
-        logger.warning("Could not parse duration from FFmpeg output")
-        return 0.0
-        
-    except Exception as e:
-        logger.error(f"Error getting video duration: {str(e)}")
-        return 0.0
-
-
 def upload_segment_to_s3(task_args) -> str:
     """
     Upload a single segment to S3. Used for thread pool execution.
@@ -925,15 +991,36 @@ def upload_segment_to_s3(task_args) -> str:
         
         # Log file size for debugging
         file_size = os.path.getsize(segment_path)
-        logger.info(f"Uploading {Path(segment_path).name} ({file_size} bytes) to S3")
+        logger.debug("Uploading %s (%s bytes) to S3", Path(segment_path).name, file_size)
         
-        s3_client.upload_file(segment_path, bucket_name, segment_key)
+        get_s3_client().upload_file(segment_path, bucket_name, segment_key,
+                                    Config=SEGMENT_UPLOAD_TRANSFER_CONFIG)
         return f"s3://{bucket_name}/{segment_key}"
     except Exception as e:
-        logger.error(f"Failed to upload segment {Path(segment_path).name}: {str(e)}")
+        logger.error("Failed to upload segment %s: %s", Path(segment_path).name, e)
         raise
 
 
+def timed_summarize_clip(s3_uri: str, job_id: str, start_time: int) -> Tuple[Dict[str, Any], float]:
+    """
+    Summarize a segment and time the Bedrock call itself.
+    
+    The clock starts inside the worker, so time a segment spends queued behind other
+    videos' segments in bedrock_executor does not count as Bedrock latency.
+    
+    Args:
+        s3_uri: S3 URI of the video segment
+        job_id: Analysis job ID
+        start_time: Start time of the segment in seconds
+        
+    Returns:
+        Tuple of (summarize_clip result, call duration in seconds)
+    """
+    started_at = time.monotonic()
+    result = summarize_clip(s3_uri, job_id, start_time, client=get_bedrock_fanout_client(BEDROCK_REGION))
+    return result, time.monotonic() - started_at
+
+
 def summarize_video_segments(job_id: str, uploaded_segments: List[str], segment_duration: int = 5) -> Dict[str, Any]:
     """
     Process all video segments through Bedrock for summarization.
@@ -947,21 +1034,20 @@ def summarize_video_segments(job_id: str, uploaded_segments: List[str], segment_
         Dict containing summarization results
     """
     try:
-        logger.info(f"Starting video summarization for {len(uploaded_segments)} segments")
+        logger.info("Starting video summarization for %s segments", len(uploaded_segments))
         
         # Extract segment indices from URLs and create mapping with calculated start times
         # URL format: s3://bucket/videos/{job_id}/segments/{segment_index}.mp4 (0.mp4, 1.mp4, 2.mp4, etc.)
         segment_mapping = {}  # start_time -> s3_uri
         for segment_url in uploaded_segments:
             try:
-                # Extract segment index from filename
-                filename = Path(segment_url).name  # e.g., "2.mp4"
-                segment_index = int(filename.split('.')[0])  # e.g., 2
+                # Extract segment index from the filename between the last '/' and '.'
+                segment_index = int(segment_url[segment_url.rfind('/') + 1:segment_url.rfind('.')])  # e.g., 2
                 # Calculate start time from segment index, file name starts from 1
                 start_time = segment_index * segment_duration  # e.g. second file (2 - 1) * 5 = 5
                 segment_mapping[start_time] = segment_url
-            except (ValueError, IndexError) as e:
-                logger.warning(f"Could not parse start time from segment URL {segment_url}: {str(e)}")
+            except ValueError as e:
+                logger.warning("Could not parse start time from segment URL %s: %s", segment_url, e)
                 continue
         
         # Sort segments by start time
@@ -977,84 +1063,103 @@ def summarize_video_segments(job_id: str, uploaded_segments: List[str], segment_
                 'results': []
             }
         
-        logger.info(f"Processing {len(segment_times)} segments: {segment_times}")
-        
-        # Process segments concurrently (but limit concurrency for Lambda)
-        results = []
-        max_workers = min(2, len(segment_times))  # Limit concurrent Bedrock requests to 2
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all summarization tasks
-            future_to_time = {
-                executor.submit(summarize_clip, segment_mapping[start_time], job_id, start_time): start_time 
-                for start_time in segment_times
-            }
+        logger.info("Processing %s segments: %s", len(segment_times), segment_times)
+        
+        # Process segments concurrently with an AIMD-controlled concurrency limit:
+        # grow additively while Bedrock latency stays healthy, halve once per throttling
+        # episode, and resubmit throttled segments after a jittered exponential backoff.
+        # Each result is stored in its segment's slot, so results stay ordered by start time
+        result_slots = {start_time: index for index, start_time in enumerate(segment_times)}
+        results = [None] * len(segment_times)
+        success_count = 0
+        concurrency = float(min(2, BEDROCK_MAX_CONCURRENCY))
+        latencies = deque(maxlen=BEDROCK_LATENCY_WINDOW)
+        throttle_retries = {}
+        pending_times = deque(segment_times)
+        backoff_times = []  # heap of (ready_at, start_time) for throttled segments
+        in_flight = {}  # future -> (start_time, submission sequence number)
+        submitted_count = 0
+        last_decrease_seq = 0  # submissions before this one were sent under the old limit
+        
+        while pending_times or in_flight or backoff_times:
+            # Requeue throttled segments whose backoff has elapsed
+            now = time.monotonic()
+            while backoff_times and backoff_times[0][0] <= now:
+                pending_times.append(heapq.heappop(backoff_times)[1])
+            
+            # Submit summarization tasks up to the current concurrency limit
+            while pending_times and len(in_flight) < int(concurrency):
+                start_time = pending_times.popleft()
+                future = bedrock_executor.submit(timed_summarize_clip, segment_mapping[start_time], job_id, start_time)
+                in_flight[future] = (start_time, submitted_count)
+                submitted_count += 1
+            
+            if not in_flight:
+                # Only backing-off segments remain
+                time.sleep(max(0.0, backoff_times[0][0] - time.monotonic()))
+                continue
             
-            # Collect results as they complete
-            for future in as_completed(future_to_time):
-                start_time = future_to_time[future]
+            timeout = max(0.0, backoff_times[0][0] - time.monotonic()) if backoff_times else None
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                start_time, submission_seq = in_flight.pop(future)
                 try:
-                    result = future.result()
-                    results.append(result)
+                    result, latency = future.result()
+                    latencies.append(latency)
+                    
+                    if (result.get('error_code') in THROTTLING_ERROR_CODES
+                            and throttle_retries.get(start_time, 0) < BEDROCK_MAX_THROTTLE_RETRIES):
+                        attempt = throttle_retries.get(start_time, 0) + 1
+                        throttle_retries[start_time] = attempt
+                        
+                        # Multiplicative decrease once per throttling episode: calls submitted
+                        # before the last decrease were sent under the old limit and don't count again
+                        if submission_seq >= last_decrease_seq:
+                            concurrency = max(BEDROCK_MIN_CONCURRENCY, concurrency * 0.5)
+                            last_decrease_seq = submitted_count
+                        
+                        # Resubmit after an exponential backoff with equal jitter
+                        backoff = min(BEDROCK_THROTTLE_BACKOFF_MAX_SECONDS,
+                                      BEDROCK_THROTTLE_BACKOFF_BASE_SECONDS * 2 ** attempt)
+                        delay = backoff / 2 + random.uniform(0, backoff / 2)
+                        heapq.heappush(backoff_times, (time.monotonic() + delay, start_time))
+                        logger.warning("Bedrock throttled segment %s, retrying in %.1fs with concurrency %s",
+                                       start_time, delay, int(concurrency))
+                        continue
+                    
+                    # Additive increase while average latency stays within target
+                    if sum(latencies) / len(latencies) <= BEDROCK_TARGET_LATENCY_SECONDS:
+                        concurrency = min(BEDROCK_MAX_CONCURRENCY, concurrency + 0.5)
+                    
+                    results[result_slots[start_time]] = result
                     if result["status"] == "success":
-                        logger.info(f"✓ Summarized segment {result['start_time']}: {result['caption']}")
-                        # Print detailed inference result
-                        token_usage = result.get('token_usage', {})
-                        print(f"🔍 BEDROCK INFERENCE RESULT - Segment {result['start_time']}s:")
-                        print(f"   Job ID: {result['job_id']}")
-                        print(f"   Caption: {result['caption']}")
-                        print(f"   Status: {result['status']}")
-                        print(f"   Tokens: {token_usage.get('input_tokens', 0)} input + {token_usage.get('output_tokens', 0)} output = {token_usage.get('total_tokens', 0)} total")
-                        print("---")
+                        success_count += 1
+                        logger.info("✓ Summarized segment %s (%s tokens): %s", result['start_time'],
+                                    result.get('token_usage', {}).get('total_tokens', 0), result['caption'])
                     else:
-                        logger.error(f"✗ Failed to summarize segment {result['start_time']}: {result.get('error', 'Unknown error')}")
-                        print(f"❌ BEDROCK INFERENCE FAILED - Segment {result['start_time']}s:")
-                        print(f"   Job ID: {result['job_id']}")
-                        print(f"   Error: {result.get('error', 'Unknown error')}")
-                        print(f"   Status: {result['status']}")
-                        print("---")
+                        logger.error("✗ Failed to summarize segment %s: %s", result['start_time'], result.get('error', 'Unknown error'))
                 except Exception as e:
-                    logger.error(f"✗ Exception summarizing segment {start_time}: {str(e)}")
-                    results.append({
+                    logger.error("✗ Exception summarizing segment %s: %s", start_time, e)
+                    results[result_slots[start_time]] = {
                         "job_id": job_id,
                         "start_time": start_time,
                         "caption": None,
                         "status": "error",
                         "error": str(e),
-                    })
+                    }
         
-        # Sort results by start time
-        results.sort(key=lambda x: x["start_time"])
-        
-        success_count = sum(1 for r in results if r["status"] == "success")
-        
-        logger.info(f"Video summarization completed: {success_count}/{len(results)} segments processed successfully")
-        
-        # Print all results for now (as requested)
-        print("\n" + "="*80)
-        print("🎬 VIDEO SEGMENT SUMMARIES - BEDROCK INFERENCE RESULTS")
-        print("="*80)
-        for result in results:
-            if result["status"] == "success":
-                print(f"⏱️  Segment {result['start_time']}s → {result['caption']}")
-                logger.info(f"Segment {result['start_time']}s: {result['caption']}")
-            else:
-                print(f"❌ Segment {result['start_time']}s → ERROR: {result.get('error', 'Unknown error')}")
-                logger.info(f"Segment {result['start_time']}s: ERROR - {result.get('error', 'Unknown error')}")
-        print("="*80)
-        print(f"📊 Summary: {success_count} successful, {len(results) - success_count} failed out of {len(results)} total segments")
-        print("="*80 + "\n")
+        logger.info("Video summarization completed: %s/%s segments processed successfully", success_count, len(results))
         
         # Save inference results to DynamoDB VideoAnalysisTable
         logger.info("Saving segment captions to DynamoDB VideoAnalysisTable...")
         save_result = save_batch_segment_captions(results)
         
         if save_result['success']:
-            logger.info(f"✓ Successfully saved {save_result['saved_count']} segment captions to DynamoDB")
+            logger.info("✓ Successfully saved %s segment captions to DynamoDB", save_result['saved_count'])
         else:
-            logger.error(f"✗ Failed to save segment captions to DynamoDB: {save_result['failed_count']} failures")
+            logger.error("✗ Failed to save segment captions to DynamoDB: %s failures", save_result['failed_count'])
             for error in save_result.get('errors', []):
-                logger.error(f"  - {error}")
+                logger.error("  - %s", error)
         
         return {
             'success': True,
@@ -1067,7 +1172,7 @@ def summarize_video_segments(job_id: str, uploaded_segments: List[str], segment_
         }
         
     except Exception as e:
-        logger.error(f"Error in video summarization workflow: {str(e)}")
+        logger.error("Error in video summarization workflow: %s", e)
         return {
             'success': False,
             'error': str(e),
@@ -6,26 +6,59 @@ It provides functions to store caption data from Bedrock inference results.
 """
 
 import os
-import boto3
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from decimal import Decimal
 import time
+from aws_clients import get_dynamodb_resource
 
 # Configure logging
 logger = logging.getLogger()
 if not logger.handlers:
-    logger.setLevel(logging.INFO)
+    logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 
 # Initialize DynamoDB client
-dynamodb = boto3.resource('dynamodb')
+dynamodb = get_dynamodb_resource()
 
 # Get table name from environment variable
 VIDEO_ANALYSIS_TABLE_NAME = os.environ.get('DYNAMODB_TABLE_NAME')
 video_analysis_table = dynamodb.Table(VIDEO_ANALYSIS_TABLE_NAME) if VIDEO_ANALYSIS_TABLE_NAME else None
 
 
+def build_segment_caption_item(job_id: str, segment_start_time: int,
+                               caption: str, inference_metadata: Dict[str, Any] = None,
+                               timestamp: str = None, created_at: int = None) -> Dict[str, Any]:
+    """
+    Build the VideoAnalysisTable item for a video segment caption.
+    
+    Args:
+        job_id: Analysis job ID
+        segment_start_time: Start time of the segment in seconds
+        caption: The inference result caption from Bedrock
+        inference_metadata: Additional metadata about the inference
+        timestamp: ISO timestamp of the save (default: now)
+        created_at: Unix timestamp of the save in milliseconds (default: now)
+        
+    Returns:
+        DynamoDB item for the video analysis table
+    """
+    item = {
+        'jobIdPartitionId': job_id,  # Use job_id directly as partition key
+        'segmentStartTime': segment_start_time,
+        'caption': caption,
+        'jobId': job_id,
+        'timestamp': timestamp or datetime.utcnow().isoformat() + 'Z',
+        'createdAt': created_at or int(time.time() * 1000)  # Unix timestamp in milliseconds
+    }
+    
+    # Add inference metadata if provided
+    if inference_metadata:
+        item['inferenceMetadata'] = inference_metadata
+    
+    return item
+
+
 def save_segment_caption(job_id: str, segment_start_time: int, 
                         caption: str, inference_metadata: Dict[str, Any] = None) -> bool:
     """
@@ -45,27 +78,13 @@ def save_segment_caption(job_id: str, segment_start_time: int,
         return False
     
     try:
-        # Prepare the item to store
-        item = {
-            'jobIdPartitionId': job_id,  # Use job_id directly as partition key
-            'segmentStartTime': segment_start_time,
-            'caption': caption,
-            'jobId': job_id,
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
-            'createdAt': int(time.time() * 1000)  # Unix timestamp in milliseconds
-        }
-        
-        # Add inference metadata if provided
-        if inference_metadata:
-            item['inferenceMetadata'] = inference_metadata
-        
-        # Save to DynamoDB
+        item = build_segment_caption_item(job_id, segment_start_time, caption, inference_metadata)
         video_analysis_table.put_item(Item=item)
-        logger.info(f"✓ Saved caption for segment {segment_start_time}s (job: {job_id})")
+        logger.info("✓ Saved caption for segment %ss (job: %s)", segment_start_time, job_id)
         return True
         
     except Exception as e:
-        logger.error(f"Failed to save caption for segment {segment_start_time}s: {str(e)}")
+        logger.error("Failed to save caption for segment %ss: %s", segment_start_time, e)
         return False
 
 
@@ -73,6 +92,9 @@ def save_batch_segment_captions(inference_results: List[Dict[str, Any]]) -> Dict
     """
     Save multiple segment captions in batch to DynamoDB.
     
+    The batch writer groups puts into BatchWriteItem requests of up to 25 items
+    and automatically resends unprocessed items.
+    
     Args:
         inference_results: List of inference results from Bedrock processing
         
@@ -86,48 +108,50 @@ def save_batch_segment_captions(inference_results: List[Dict[str, Any]]) -> Dict
     saved_count = 0
     failed_count = 0
     errors = []
+    items = []
     
     try:
-        logger.info(f"Starting batch save of {len(inference_results)} segment captions")
+        logger.info("Starting batch save of %s segment captions", len(inference_results))
+        
+        # One save time for the whole batch
+        timestamp = datetime.utcnow().isoformat() + 'Z'
+        created_at = int(time.time() * 1000)
         
         for result in inference_results:
             if result.get('status') == 'success' and result.get('caption'):
-                job_id = result.get('job_id')
-                start_time = result.get('start_time')
-                caption = result.get('caption')
-                
                 # Prepare inference metadata
                 inference_metadata = {
                     'status': result.get('status'),
                     'model_id': 'us.amazon.nova-pro-v1:0',  # From the summarize.py module
-                    'inference_timestamp': datetime.utcnow().isoformat() + 'Z'
+                    'inference_timestamp': timestamp
                 }
                 
                 # Add error information if available
                 if result.get('error'):
                     inference_metadata['error'] = result.get('error')
                 
-                success = save_segment_caption(
-                    job_id=job_id,
-                    segment_start_time=start_time,
-                    caption=caption,
-                    inference_metadata=inference_metadata
-                )
-                
-                if success:
-                    saved_count += 1
-                else:
-                    failed_count += 1
-                    errors.append(f"Failed to save segment {start_time}s")
+                items.append(build_segment_caption_item(
+                    job_id=result.get('job_id'),
+                    segment_start_time=result.get('start_time'),
+                    caption=result.get('caption'),
+                    inference_metadata=inference_metadata,
+                    timestamp=timestamp,
+                    created_at=created_at
+                ))
             else:
                 # Skip failed inference results
                 failed_count += 1
                 start_time = result.get('start_time', 'unknown')
                 error_msg = result.get('error', 'No caption available')
                 errors.append(f"Skipped segment {start_time}s: {error_msg}")
-                logger.warning(f"Skipping failed inference result for segment {start_time}s: {error_msg}")
+                logger.warning("Skipping failed inference result for segment %ss: %s", start_time, error_msg)
+        
+        with video_analysis_table.batch_writer(overwrite_by_pkeys=['jobId', 'segmentStartTime']) as batch:
+            for item in items:
+                batch.put_item(Item=item)
+        saved_count = len(items)
         
-        logger.info(f"Batch save completed: {saved_count} saved, {failed_count} failed")
+        logger.info("Batch save completed: %s saved, %s failed", saved_count, failed_count)
         
         return {
             'success': saved_count > 0,
@@ -138,11 +162,11 @@ def save_batch_segment_captions(inference_results: List[Dict[str, Any]]) -> Dict
         }
         
     except Exception as e:
-        logger.error(f"Error in batch caption save: {str(e)}")
+        logger.error("Error in batch caption save: %s", e)
         return {
             'success': False,
             'saved_count': saved_count,
-            'failed_count': failed_count + (len(inference_results) - saved_count),
+            'failed_count': len(inference_results) - saved_count,
             'total_processed': len(inference_results),
             'errors': errors + [f"Batch operation error: {str(e)}"]
         }
@@ -172,14 +196,14 @@ def get_segment_caption(job_id: str, segment_start_time: float) -> Optional[Dict
         )
         
         if 'Item' in response:
-            logger.info(f"Retrieved segment caption for job {job_id} at {segment_start_time}s")
+            logger.info("Retrieved segment caption for job %s at %ss", job_id, segment_start_time)
             return response['Item']
         else:
-            logger.info(f"No segment caption found for job {job_id} at {segment_start_time}s")
+            logger.info("No segment caption found for job %s at %ss", job_id, segment_start_time)
             return None
             
     except Exception as e:
-        logger.error(f"Error getting segment caption for job {job_id} at {segment_start_time}s: {str(e)}")
+        logger.error("Error getting segment caption for job %s at %ss: %s", job_id, segment_start_time, e)
         return None
 
 
@@ -198,7 +222,7 @@ def list_job_segment_captions(job_id: str) -> List[Dict[str, Any]]:
         return []
     
     try:
-        logger.info(f"Querying segments for job {job_id}")
+        logger.info("Querying segments for job %s", job_id)
         
         # Query all segments for this job
         response = video_analysis_table.query(
@@ -209,10 +233,10 @@ def list_job_segment_captions(job_id: str) -> List[Dict[str, Any]]:
         )
         
         segments = response.get('Items', [])
-        logger.info(f"Found {len(segments)} segments for job {job_id}")
+        logger.info("Found %s segments for job %s", len(segments), job_id)
         
         return segments
         
     except Exception as e:
-        logger.error(f"Error listing segments for job {job_id}: {str(e)}")
+        logger.error("Error listing segments for job %s: %s", job_id, e)
         return []
\ No newline at end of file
@@ -1,17 +1,74 @@
-import boto3
 import json
 import logging
-from typing import Dict, Any
+from contextlib import closing
+from botocore.exceptions import ClientError
+from typing import Dict, Any, Optional
+from aws_clients import get_bedrock_client
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # Initialize Bedrock client
-bedrock_client = boto3.client("bedrock-runtime", region_name="us-east-1")
+BEDROCK_REGION = "us-east-1"
+bedrock_client = get_bedrock_client(BEDROCK_REGION)
 
 # Bedrock model configuration
 MODEL_ID = "us.amazon.nova-pro-v1:0"
 
+# System message: concise immutable rules
+SYSTEM_MESSAGES = [
+    {
+        "text": (
+            "You are a video surveillance analysis assistant.\n"
+            "Rules:\n"
+            "1. State only directly observable visual events.\n"
+            "2. No guesses about identity, intent, emotions, causes.\n"
+            "3. Exactly one short, neutral sentence.\n"
+            "4. No extra commentary, no markdown, no reasoning, no explanations.\n"
+            "5. Output MUST be valid minified JSON only.\n"
+            "6. If threat_level required, base it ONLY on visible actions per supplied scale.\n"
+        )
+    }
+]
+
+INFERENCE_CONFIG = {"maxTokens": 1500, "temperature": 0.0, "topP": 0.9}
+
+# Map common extensions to Bedrock format names
+VIDEO_FORMATS = {
+    "mp4": "mp4",
+    "mov": "mov",
+    "mkv": "mkv",
+    "webm": "webm",
+    "avi": "avi",
+    "flv": "flv",
+    "mpeg": "mpeg",
+    "mpg": "mpeg",
+    "ts": "ts",
+}
+
+# Output format instructions appended to the task prompt
+CAPTION_OUTPUT_FORMAT = (
+    'Return JSON: {"caption":"<sentence or empty string>"}. If no event, caption="".'
+)
+THREAT_OUTPUT_FORMAT = (
+    "Threat scale (deterministic):\n"
+    "- high: Visible violence, weapon brandished/used, forced entry / active break-in, fire/explosion, person physically attacking, clear hazardous act (e.g., climbing high unstable structure), active vandalism/tampering of critical equipment.\n"
+    "- medium: Suspicious probing (trying door handles), loitering in restricted-looking area, unauthorized area access without force, object concealment gesture, minor property tampering (touching camera/lock), pickpocket, escalating confrontation (raised hands, aggressive posture) without confirmed physical contact.\n"
+    "- low: Routine benign activity (walking, idle standing, normal conversation, vehicles passing) or no meaningful event.\n"
+    "If ambiguous, choose the lower level. Do NOT infer intent.\n"
+    'Return JSON: {"caption":"<sentence or empty string>",'
+    '"threat_level":"low|medium|high"}. If no event, caption="" and threat_level="low".'
+)
+
+# Request body skeleton with the invariant system prompt and inference config
+# serialized once at import; callers append the messages array and closing brace
+REQUEST_BODY_PREFIX = (
+    '{"schemaVersion": "messages-v1", '
+    f'"system": {json.dumps(SYSTEM_MESSAGES)}, '
+    f'"inferenceConfig": {json.dumps(INFERENCE_CONFIG)}, '
+    '"messages": '
+)
+
 
 def summarize_clip(
     s3_uri: str = None,
@@ -21,6 +78,7 @@ def summarize_clip(
     video_base64: str = None,
     include_threat_assessment: bool = False,
     user_prompt: str = None,
+    client: Optional[Any] = None,
 ) -> Dict[str, Any]:
     """
     Summarize a video segment using Amazon Bedrock Nova.
@@ -33,6 +91,7 @@ def summarize_clip(
         video_base64: Base64 encoded video data (alternative to s3_uri for direct processing)
         include_threat_assessment: If True, includes threat level assessment in the response
         user_prompt: Optional custom prompt from user to guide the analysis
+        client: Bedrock runtime client to call (default: the shared client)
 
     Returns:
         Dict containing caption, status information, and optionally threat level
@@ -66,56 +125,23 @@ def summarize_clip(
             else:
                 file_extension = "mp4"  # Default for base64 input
 
-            # Map common extensions to Bedrock format names
-            format_mapping = {
-                "mp4": "mp4",
-                "mov": "mov",
-                "mkv": "mkv",
-                "webm": "webm",
-                "avi": "avi",
-                "flv": "flv",
-                "mpeg": "mpeg",
-                "mpg": "mpeg",
-                "ts": "ts",
-            }
-            video_format = format_mapping.get(
+            video_format = VIDEO_FORMATS.get(
                 file_extension, "mp4"
             )  # Default to mp4 if unknown
 
         input_source = "base64 data" if video_base64 else s3_uri
         logger.info(
-            f"Summarizing segment {start_time} for job {job_id} from {input_source} (format: {video_format})"
+            "Summarizing segment %s for job %s from %s (format: %s)",
+            start_time,
+            job_id,
+            input_source,
+            video_format,
         )
 
-        # System message: concise immutable rules
-        system_msgs = [
-            {
-                "text": (
-                    "You are a video surveillance analysis assistant.\n"
-                    "Rules:\n"
-                    "1. State only directly observable visual events.\n"
-                    "2. No guesses about identity, intent, emotions, causes.\n"
-                    "3. Exactly one short, neutral sentence.\n"
-                    "4. No extra commentary, no markdown, no reasoning, no explanations.\n"
-                    "5. Output MUST be valid minified JSON only.\n"
-                    "6. If threat_level required, base it ONLY on visible actions per supplied scale.\n"
-                )
-            }
-        ]
-
-        # Determine output format instructions (add explicit scale when threat assessment requested)
-        if include_threat_assessment:
-            output_format = (
-                "Threat scale (deterministic):\n"
-                "- high: Visible violence, weapon brandished/used, forced entry / active break-in, fire/explosion, person physically attacking, clear hazardous act (e.g., climbing high unstable structure), active vandalism/tampering of critical equipment.\n"
-                "- medium: Suspicious probing (trying door handles), loitering in restricted-looking area, unauthorized area access without force, object concealment gesture, minor property tampering (touching camera/lock), pickpocket, escalating confrontation (raised hands, aggressive posture) without confirmed physical contact.\n"
-                "- low: Routine benign activity (walking, idle standing, normal conversation, vehicles passing) or no meaningful event.\n"
-                "If ambiguous, choose the lower level. Do NOT infer intent.\n"
-                'Return JSON: {"caption":"<sentence or empty string>",'
-                '"threat_level":"low|medium|high"}. If no event, caption="" and threat_level="low".'
-            )
-        else:
-            output_format = 'Return JSON: {"caption":"<sentence or empty string>"}. If no event, caption="".'
+        # Output format instructions (explicit scale when threat assessment requested)
+        output_format = (
+            THREAT_OUTPUT_FORMAT if include_threat_assessment else CAPTION_OUTPUT_FORMAT
+        )
 
         # Sanitize user prompt to reduce injection surface
         safe_user_context = ""
@@ -149,19 +175,14 @@ def summarize_clip(
             }
         ]
 
-        inference_config = {"maxTokens": 1500, "temperature": 0.0, "topP": 0.9}
-
-        native_request = {
-            "schemaVersion": "messages-v1",
-            "messages": message_list,
-            "system": system_msgs,
-            "inferenceConfig": inference_config,
-        }
+        # Only the per-segment message list is serialized on each call
+        request_body = REQUEST_BODY_PREFIX + json.dumps(message_list) + "}"
 
-        resp = bedrock_client.invoke_model(
-            modelId=MODEL_ID, body=json.dumps(native_request)
-        )
-        body = json.loads(resp["body"].read())
+        resp = (client or bedrock_client).invoke_model(modelId=MODEL_ID, body=request_body)
+        # Parse straight from the streaming body and always close it, so the
+        # pooled connection is released even if the payload is malformed
+        with closing(resp["body"]) as response_stream:
+            body = json.load(response_stream)
         output_text = body["output"]["message"]["content"][0]["text"]
 
         # Extract token usage information
@@ -170,34 +191,26 @@ def summarize_clip(
         output_tokens = usage.get("outputTokens", 0)
         total_tokens = input_tokens + output_tokens
 
-        # Print detailed Bedrock inference information
-        print(f"\n🤖 BEDROCK INFERENCE - Job: {job_id}, Segment: {start_time}s")
-        print(f"📹 Video Source: {'S3' if s3_uri else 'Base64'}")
-        print(f"🧠 Model: {MODEL_ID}")
-        print(
-            f"🔢 Token Usage: {input_tokens} input + {output_tokens} output = {total_tokens} total"
-        )
-        print(f"💭 Response: {output_text}")
-        print("-" * 60)
-
-        logger.info(f"Bedrock response for segment {start_time}: {output_text}")
+        logger.info("Bedrock response for segment %s: %s", start_time, output_text)
         logger.info(
-            f"Token usage - Input: {input_tokens}, Output: {output_tokens}, Total: {total_tokens}"
+            "Token usage - Input: %s, Output: %s, Total: %s",
+            input_tokens,
+            output_tokens,
+            total_tokens,
         )
 
         # Parse JSON response uniformly
-        import json as json_module
-
         caption = None
         threat_level = None
         try:
-            response_data = json_module.loads(output_text.strip())
+            response_data = json.loads(output_text.strip())
             caption = response_data.get("caption", "")
             if include_threat_assessment:
                 threat_level = response_data.get("threat_level", "low")
-        except json_module.JSONDecodeError:
+        except json.JSONDecodeError:
             logger.warning(
-                f"Failed to parse JSON response, using raw text as caption: {output_text}"
+                "Failed to parse JSON response, using raw text as caption: %s",
+                output_text,
             )
             caption = output_text
             if include_threat_assessment:
@@ -219,11 +232,15 @@ def summarize_clip(
         return result
 
     except Exception as e:
-        logger.error(f"Error summarizing segment {start_time}: {str(e)}")
-        return {
+        logger.error("Error summarizing segment %s: %s", start_time, e)
+        error_result = {
             "job_id": job_id,
             "start_time": start_time,
             "caption": None,
             "status": "error",
             "error": str(e),
         }
+        # Surface the Bedrock error code so callers can react to throttling
+        if isinstance(e, ClientError):
+            error_result["error_code"] = e.response.get("Error", {}).get("Code")
+        return error_result
@@ -1,19 +1,27 @@
 import json
 import logging
 import base64
-import tempfile
 import os
+import re
 import subprocess
-import shlex
 from typing import Dict, Any, Optional
 from summarize import summarize_clip
 
 # Configure logging
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
 
 # FFmpeg path in Lambda layer
 FFMPEG_PATH = "/opt/bin/ffmpeg"
+FFPROBE_PATH = FFMPEG_PATH.replace("ffmpeg", "ffprobe")
+
+# The layer contents cannot change while the container lives, so check once at load
+FFPROBE_AVAILABLE = os.path.exists(FFPROBE_PATH)
+
+# Patterns for the FFmpeg/FFprobe stderr banner, compiled once per container
+DURATION_PATTERN = re.compile(r"Duration: (\d{2}):(\d{2}):(\d{2})\.(\d{2})")
+VIDEO_STREAM_PATTERN = re.compile(r"Video: ([^,]+).*?(\d+)x(\d+).*?(\d+(?:\.\d+)?) fps")
+INPUT_FORMAT_PATTERN = re.compile(r"Input #0, ([^,]+)")
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -48,16 +56,16 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             try:
                 body = base64.b64decode(body)
             except Exception as e:
-                logger.error(f"Failed to decode base64 body: {str(e)}")
+                logger.error("Failed to decode base64 body: %s", e)
                 return create_error_response(400, "Invalid base64 encoded body")
 
         # Extract content type to determine how to parse the video
         headers = event.get("headers", {})
         content_type = headers.get("content-type", headers.get("Content-Type", ""))
 
-        logger.info(f"Content-Type: {content_type}")
-        logger.info(f"Body size: {len(body)} bytes")
-        logger.info(f"Is Base64 encoded: {is_base64_encoded}")
+        logger.info("Content-Type: %s", content_type)
+        logger.info("Body size: %s bytes", len(body))
+        logger.info("Is Base64 encoded: %s", is_base64_encoded)
 
         # Handle different input formats
         video_data = None
@@ -72,7 +80,9 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             if not user_prompt:
                 user_prompt = headers.get("x-user-prompt")
             logger.info(
-                f"Multipart upload detected: filename={original_filename}, user_prompt={user_prompt}"
+                "Multipart upload detected: filename=%s, user_prompt=%s",
+                original_filename,
+                user_prompt,
             )
         elif (
             content_type.startswith("video/")
@@ -113,7 +123,10 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             # For binary uploads, check for user_prompt in headers
             user_prompt = headers.get("x-user-prompt")
             logger.info(
-                f"Binary upload detected: content-type={content_type}, filename={original_filename}, user_prompt={user_prompt}"
+                "Binary upload detected: content-type=%s, filename=%s, user_prompt=%s",
+                content_type,
+                original_filename,
+                user_prompt,
             )
         else:
             return create_error_response(
@@ -125,7 +138,9 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             return create_error_response(400, "No video data found in request")
 
         logger.info(
-            f"Extracted video data: {len(video_data)} bytes, filename: {original_filename}"
+            "Extracted video data: %s bytes, filename: %s",
+            len(video_data),
+            original_filename,
         )
 
         # Validate video format
@@ -156,11 +171,11 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token",
                 "Access-Control-Allow-Methods": "OPTIONS,POST",
             },
-            "body": json.dumps(inference_result, indent=2),
+            "body": json.dumps(inference_result),
         }
 
     except Exception as e:
-        logger.error(f"Error processing direct video inference: {str(e)}")
+        logger.error("Error processing direct video inference: %s", e)
         return create_error_response(500, f"Internal server error: {str(e)}")
 
 
@@ -246,13 +261,15 @@ def parse_multipart_video(
 
                     video_data = field_data
                     logger.info(
-                        f"Found video file: {filename}, size: {len(field_data)} bytes"
+                        "Found video file: %s, size: %s bytes",
+                        filename,
+                        len(field_data),
                     )
 
                 elif field_name == "user_prompt":
                     # This is the user prompt text field
                     user_prompt = field_data.decode("utf-8", errors="ignore").strip()
-                    logger.info(f"Found user prompt: {user_prompt}")
+                    logger.info("Found user prompt: %s", user_prompt)
 
         if video_data is None:
             logger.error("No video file found in multipart data")
@@ -261,7 +278,7 @@ def parse_multipart_video(
         return video_data, filename, user_prompt
 
     except Exception as e:
-        logger.error(f"Error parsing multipart data: {str(e)}")
+        logger.error("Error parsing multipart data: %s", e)
         return None, None, None
 
 
@@ -285,7 +302,7 @@ def process_video_for_inference(
         # Get basic video info for response
         video_info = {"file_size": len(video_data), "format": video_format}
         logger.info(
-            f"Processing video: {len(video_data)} bytes, format: {video_format}"
+            "Processing video: %s bytes, format: %s", len(video_data), video_format
         )
 
         # Use original video directly - encode as base64 for Bedrock
@@ -295,7 +312,7 @@ def process_video_for_inference(
 
         # Encode video data to base64
         video_base64 = base64.b64encode(video_data).decode("utf-8")
-        logger.info(f"Encoded video to base64: {len(video_base64)} characters")
+        logger.info("Encoded video to base64: %s characters", len(video_base64))
 
         try:
             # Run Bedrock inference with base64 data
@@ -331,7 +348,7 @@ def process_video_for_inference(
             raise
 
     except Exception as e:
-        logger.error(f"Error processing video for inference: {str(e)}")
+        logger.error("Error processing video for inference: %s", e)
         return {"success": False, "error": str(e)}
 
     finally:
@@ -405,13 +422,17 @@ def validate_video_format(filename: str, video_data: bytes) -> Dict[str, Any]:
 
         if not signature_found:
             logger.warning(
-                f"No expected signature found for {file_extension} format, but proceeding anyway"
+                "No expected signature found for %s format, but proceeding anyway",
+                file_extension,
             )
             # Don't fail here - signature check is just a warning, file extension is sufficient
             # Note: WebM and MKV both use Matroska container with same signature
 
         logger.info(
-            f"Video format validation passed: {filename} -> {file_extension} (MIME: {format_info['mime']})"
+            "Video format validation passed: %s -> %s (MIME: %s)",
+            filename,
+            file_extension,
+            format_info['mime'],
         )
         return {
             "valid": True,
@@ -420,7 +441,7 @@ def validate_video_format(filename: str, video_data: bytes) -> Dict[str, Any]:
         }
 
     except Exception as e:
-        logger.error(f"Error validating video format: {str(e)}")
+        logger.error("Error validating video format: %s", e)
         return {"valid": False, "error": f"Format validation error: {str(e)}"}
 
 
@@ -436,7 +457,7 @@ def get_simple_video_info(video_path: str) -> Dict[str, Any]:
     """
     try:
         file_size = os.path.getsize(video_path)
-        logger.info(f"Video file size: {file_size} bytes")
+        logger.info("Video file size: %s bytes", file_size)
 
         return {
             "file_size": file_size,
@@ -444,7 +465,7 @@ def get_simple_video_info(video_path: str) -> Dict[str, Any]:
             "note": "Using original format (no detailed analysis for speed)",
         }
     except Exception as e:
-        logger.error(f"Error getting video info: {str(e)}")
+        logger.error("Error getting video info: %s", e)
         return {"file_size": 0, "format": "unknown", "error": str(e)}
 
 
@@ -460,19 +481,19 @@ def get_video_info(video_path: str) -> Dict[str, Any]:
     """
     try:
         # Use FFprobe to get detailed video information
-        cmd = [
-            FFMPEG_PATH.replace("ffmpeg", "ffprobe"),  # Use ffprobe if available
-            "-v",
-            "quiet",
-            "-print_format",
-            "json",
-            "-show_format",
-            "-show_streams",
-            video_path,
-        ]
-
-        # Fallback to FFmpeg if ffprobe not available
-        if not os.path.exists(FFMPEG_PATH.replace("ffmpeg", "ffprobe")):
+        if FFPROBE_AVAILABLE:
+            cmd = [
+                FFPROBE_PATH,
+                "-v",
+                "quiet",
+                "-print_format",
+                "json",
+                "-show_format",
+                "-show_streams",
+                video_path,
+            ]
+        else:
+            # Fallback to FFmpeg if ffprobe not available
             cmd = [FFMPEG_PATH, "-i", video_path, "-f", "null", "-"]
 
         result = subprocess.run(
@@ -511,13 +532,13 @@ def get_video_info(video_path: str) -> Dict[str, Any]:
                     ),
                 }
             except Exception as e:
-                logger.error(f"Error parsing ffprobe output: {str(e)}")
+                logger.error("Error parsing ffprobe output: %s", e)
 
         # Fallback: parse FFmpeg stderr output
         return parse_basic_video_info(result.stderr)
 
     except Exception as e:
-        logger.error(f"Error getting video info: {str(e)}")
+        logger.error("Error getting video info: %s", e)
         return {
             "duration": 0,
             "format": "unknown",
@@ -532,8 +553,6 @@ def get_video_info(video_path: str) -> Dict[str, Any]:
 
 def parse_basic_video_info(ffmpeg_output: str) -> Dict[str, Any]:
     """Parse basic video info from FFmpeg stderr output."""
-    import re
-
     info = {
         "duration": 0,
         "format": "unknown",
@@ -546,17 +565,13 @@ def parse_basic_video_info(ffmpeg_output: str) -> Dict[str, Any]:
 
     try:
         # Parse duration
-        duration_match = re.search(
-            r"Duration: (\d{2}):(\d{2}):(\d{2})\.(\d{2})", ffmpeg_output
-        )
+        duration_match = DURATION_PATTERN.search(ffmpeg_output)
         if duration_match:
             h, m, s, cs = map(int, duration_match.groups())
             info["duration"] = h * 3600 + m * 60 + s + cs / 100
 
         # Parse codec and resolution
-        video_match = re.search(
-            r"Video: ([^,]+).*?(\d+)x(\d+).*?(\d+(?:\.\d+)?) fps", ffmpeg_output
-        )
+        video_match = VIDEO_STREAM_PATTERN.search(ffmpeg_output)
         if video_match:
             info["codec"] = video_match.group(1)
             info["width"] = int(video_match.group(2))
@@ -564,12 +579,12 @@ def parse_basic_video_info(ffmpeg_output: str) -> Dict[str, Any]:
             info["fps"] = float(video_match.group(4))
 
         # Parse format
-        format_match = re.search(r"Input #0, ([^,]+)", ffmpeg_output)
+        format_match = INPUT_FORMAT_PATTERN.search(ffmpeg_output)
         if format_match:
             info["format"] = format_match.group(1)
 
     except Exception as e:
-        logger.error(f"Error parsing basic video info: {str(e)}")
+        logger.error("Error parsing basic video info: %s", e)
 
     return info
 
@@ -604,12 +619,12 @@ def parse_basic_video_info(ffmpeg_output: str) -> Dict[str, Any]:
         s3_client.upload_file(video_path, bucket_name, temp_key)
 
         s3_uri = f"s3://{bucket_name}/{temp_key}"
-        logger.info(f"Uploaded video to temporary S3 location: {s3_uri}")
+        logger.info("Uploaded video to temporary S3 location: %s", s3_uri)
 
         return s3_uri
 
     except Exception as e:
-        logger.error(f"Error uploading video to S3: {str(e)}")
+        logger.error("Error uploading video to S3: %s", e)
         return None
 
     # Commented out - using base64 instead of S3 upload
@@ -626,7 +641,7 @@ def parse_basic_video_info(ffmpeg_output: str) -> Dict[str, Any]:
         # Parse S3 URI
         uri_parts = s3_uri.replace("s3://", "").split("/", 1)
         if len(uri_parts) != 2:
-            logger.error(f"Invalid S3 URI format: {s3_uri}")
+            logger.error("Invalid S3 URI format: %s", s3_uri)
             return
 
         bucket_name, object_key = uri_parts
@@ -634,10 +649,10 @@ def parse_basic_video_info(ffmpeg_output: str) -> Dict[str, Any]:
         s3_client = boto3.client("s3")
         s3_client.delete_object(Bucket=bucket_name, Key=object_key)
 
-        logger.info(f"Cleaned up temporary S3 object: {s3_uri}")
+        logger.info("Cleaned up temporary S3 object: %s", s3_uri)
 
     except Exception as e:
-        logger.warning(f"Failed to clean up temporary S3 object {s3_uri}: {str(e)}")
+        logger.warning("Failed to clean up temporary S3 object %s: %s", s3_uri, e)
 
 
 def create_error_response(status_code: int, message: str) -> Dict[str, Any]:
@@ -6,11 +6,11 @@ It returns all segment captions for a given job ID.
 """
 
 import json
-import boto3
 import logging
 import os
 from typing import Dict, Any, List
 from decimal import Decimal
+from aws_clients import get_bedrock_client, get_dynamodb_resource
 from segment_caption_update import list_job_segment_captions
 
 
@@ -23,13 +23,13 @@ class DecimalEncoder(json.JSONEncoder):
 
 # Configure logging
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
 
 # Initialize DynamoDB client
-dynamodb = boto3.resource("dynamodb")
+dynamodb = get_dynamodb_resource()
 
 # Initialize Bedrock client for Nova Pro
-bedrock_client = boto3.client("bedrock-runtime")
+bedrock_client = get_bedrock_client()
 
 # Get table names from environment variables
 VIDEO_ANALYSIS_TABLE_NAME = os.environ.get("DYNAMODB_TABLE_NAME")
@@ -58,7 +58,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
 
     try:
-        logger.info(f"Received video query event: {json.dumps(event, indent=2)}")
+        logger.debug("Received video query event: %s", event)
 
         # Extract job ID from path parameters
         path_parameters = event.get("pathParameters", {})
@@ -109,7 +109,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 ),
             }
 
-        logger.info(f"Getting segments for job {job_id}")
+        logger.info("Getting segments for job %s", job_id)
 
         # Get all segments for the job
         segments_result = get_job_segments(job_id)
@@ -119,7 +119,9 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             "segments"
         ):
             logger.info(
-                f"Processing query '{query}' for {len(segments_result['segments'])} segments"
+                "Processing query '%s' for %s segments",
+                query,
+                len(segments_result['segments']),
             )
 
             # Invoke Nova Pro to filter segments and provide insights based on query
@@ -155,7 +157,8 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
         else:
             logger.warning(
-                f"No segments available for query processing: {segments_result.get('status')}"
+                "No segments available for query processing: %s",
+                segments_result.get('status'),
             )
             response = {
                 "jobId": job_id,
@@ -177,11 +180,11 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 "Access-Control-Allow-Headers": "Content-Type,Authorization",
                 "Access-Control-Allow-Methods": "GET,POST,OPTIONS",
             },
-            "body": json.dumps(response, indent=2, cls=DecimalEncoder),
+            "body": json.dumps(response, cls=DecimalEncoder),
         }
 
     except Exception as e:
-        logger.error(f"Error processing video query: {str(e)}")
+        logger.error("Error processing video query: %s", e)
         return {
             "statusCode": 500,
             "headers": {
@@ -276,12 +279,12 @@ def get_job_segments(job_id: str) -> Dict[str, Any]:
             "segments": segments,
         }
 
-        logger.info(f"Retrieved {len(segments)} segments for job {job_id}")
+        logger.info("Retrieved %s segments for job %s", len(segments), job_id)
 
         return response
 
     except Exception as e:
-        logger.error(f"Error getting segments for job {job_id}: {str(e)}")
+        logger.error("Error getting segments for job %s: %s", job_id, e)
         raise e
 
 
@@ -313,11 +316,11 @@ def get_job_status(job_id: str) -> Dict[str, Any]:
         if items:
             return items[0]
         else:
-            logger.warning(f"No job status found for job {job_id}")
+            logger.warning("No job status found for job %s", job_id)
             return None
 
     except Exception as e:
-        logger.error(f"Error getting job status for {job_id}: {str(e)}")
+        logger.error("Error getting job status for %s: %s", job_id, e)
         return None
 
 
@@ -440,7 +443,8 @@ Return your analysis as a JSON object following the exact format specified in th
 
         # Parse the response
         response_body = json.loads(response["body"].read())
-        logger.info(f"Nova Pro response: {json.dumps(response_body, indent=2)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Nova Pro response: %s", json.dumps(response_body))
 
         # Extract the content from the response (Nova Pro format)
         if "output" in response_body and "message" in response_body["output"]:
@@ -479,7 +483,7 @@ Return your analysis as a JSON object following the exact format specified in th
                         continue
 
                     if not (0 <= segment_id < len(segments)):
-                        logger.warning(f"Invalid segment_id {segment_id}, skipping")
+                        logger.warning("Invalid segment_id %s, skipping", segment_id)
                         continue
 
                     original_segment = segments[segment_id].copy()
@@ -501,8 +505,8 @@ Return your analysis as a JSON object following the exact format specified in th
                 }
 
             except (json.JSONDecodeError, ValueError) as e:
-                logger.error(f"Failed to parse Nova Pro JSON response: {str(e)}")
-                logger.error(f"Raw content: {content}")
+                logger.error("Failed to parse Nova Pro JSON response: %s", e)
+                logger.error("Raw content: %s", content)
                 return {
                     "status": "error",
                     "message": f"Failed to parse AI response: {str(e)}",
@@ -516,7 +520,7 @@ Return your analysis as a JSON object following the exact format specified in th
             }
 
     except Exception as e:
-        logger.error(f"Error invoking Nova Pro: {str(e)}")
+        logger.error("Error invoking Nova Pro: %s", e)
         return {
             "status": "error",
             "message": f"Failed to invoke Nova Pro: {str(e)}",
@@ -3,6 +3,8 @@ import { Construct } from 'constructs';
 import * as s3 from 'aws-cdk-lib/aws-s3';
 import * as s3n from 'aws-cdk-lib/aws-s3-notifications';
 import * as lambda from 'aws-cdk-lib/aws-lambda';
+import * as lambdaEventSources from 'aws-cdk-lib/aws-lambda-event-sources';
+import * as sqs from 'aws-cdk-lib/aws-sqs';
 import * as apigateway from 'aws-cdk-lib/aws-apigateway';
 import * as iam from 'aws-cdk-lib/aws-iam';
 import * as dynamodb from 'aws-cdk-lib/aws-dynamodb';
@@ -19,6 +21,8 @@ export class BackendStack extends cdk.Stack {
   public readonly api: apigateway.RestApi;
   public readonly videoAnalysisTable: dynamodb.Table;
   public readonly jobStatusTable: dynamodb.Table;
+  public readonly processedEventsTable: dynamodb.Table;
+  public readonly videoUploadQueue: sqs.Queue;
 
   constructor(scope: Construct, id: string, props?: cdk.StackProps) {
     super(scope, id, props);
@@ -134,6 +138,39 @@ export class BackendStack extends cdk.Stack {
       }
     });
 
+    // Add Global Secondary Index for listing recent jobs without a table scan
+    this.jobStatusTable.addGlobalSecondaryIndex({
+      indexName: 'StatusByTimeIndex',
+      partitionKey: {
+        name: 'statusBucket',
+        type: dynamodb.AttributeType.STRING
+      },
+      sortKey: {
+        name: 'uploadTimestamp',
+        type: dynamodb.AttributeType.STRING
+      },
+      // Project only the attributes list_job_status_records reads (keys are always included)
+      projectionType: dynamodb.ProjectionType.INCLUDE,
+      nonKeyAttributes: ['status', 'videoFileName', 'videoDuration', 'startTime', 'endTime']
+    });
+
+    // Create DynamoDB table recording processed S3 upload events (deduplicates redelivered notifications).
+    // Keyed by eventKey (ETag plus event sequencer) so re-uploading the same file is not dropped
+    this.processedEventsTable = new dynamodb.Table(this, 'ProcessedEventsTable', {
+      tableName: `visionaree-processed-upload-events-${this.account}-${this.region}`,
+      partitionKey: {
+        name: 'jobId',
+        type: dynamodb.AttributeType.STRING
+      },
+      sortKey: {
+        name: 'eventKey',
+        type: dynamodb.AttributeType.STRING
+      },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      removalPolicy: cdk.RemovalPolicy.DESTROY, // Only holds short-lived markers
+      timeToLiveAttribute: 'expiresAt',
+      encryption: dynamodb.TableEncryption.AWS_MANAGED
+    });
 
     // Create Lambda function for generating presigned URLs
     this.presignedUrlFunction = new lambda.Function(this, 'PresignedUrlFunction', {
@@ -157,7 +194,8 @@ export class BackendStack extends cdk.Stack {
         S3_BUCKET_NAME: this.s3Bucket.bucketName,
         SEGMENTS_BUCKET_NAME: this.segmentsBucket.bucketName,
         DYNAMODB_TABLE_NAME: this.videoAnalysisTable.tableName,
-        JOB_STATUS_TABLE_NAME: this.jobStatusTable.tableName
+        JOB_STATUS_TABLE_NAME: this.jobStatusTable.tableName,
+        PROCESSED_EVENTS_TABLE_NAME: this.processedEventsTable.tableName
       },
       timeout: cdk.Duration.minutes(15), // Increased timeout for FFmpeg processing
       memorySize: 2048, // Increased memory for video processing with FFmpeg
@@ -239,6 +277,9 @@ export class BackendStack extends cdk.Stack {
     // Grant S3 event processor permissions to write to job status table
     this.jobStatusTable.grantWriteData(this.s3EventProcessor);
 
+    // Grant S3 event processor permissions to record processed events
+    this.processedEventsTable.grantWriteData(this.s3EventProcessor);
+
     // Grant video query handler permissions to read from DynamoDB tables
     this.videoAnalysisTable.grantReadData(this.videoQueryHandler);
     this.jobStatusTable.grantReadData(this.videoQueryHandler);
@@ -481,10 +522,32 @@ export class BackendStack extends cdk.Stack {
       }
     });
 
-    // Configure S3 bucket to send upload events to the processor Lambda
+    // Buffer upload events in SQS so bursts of uploads are queued instead of
+    // each one starting its own FFmpeg/Bedrock pipeline immediately
+    const videoUploadDlq = new sqs.Queue(this, 'VideoUploadDLQ', {
+      retentionPeriod: cdk.Duration.days(14)
+    });
+
+    this.videoUploadQueue = new sqs.Queue(this, 'VideoUploadQueue', {
+      visibilityTimeout: cdk.Duration.minutes(90), // 6x the processor timeout
+      deadLetterQueue: {
+        queue: videoUploadDlq,
+        maxReceiveCount: 3
+      }
+    });
+
+    // One upload per invocation, so every video gets the processor's full CPU, /tmp and
+    // 15 minute budget; failed uploads are reported back so SQS retries them and
+    // eventually moves them to the DLQ
+    this.s3EventProcessor.addEventSource(new lambdaEventSources.SqsEventSource(this.videoUploadQueue, {
+      batchSize: 1,
+      reportBatchItemFailures: true
+    }));
+
+    // Configure S3 bucket to send upload events to the upload queue
     this.s3Bucket.addEventNotification(
       s3.EventType.OBJECT_CREATED,
-      new s3n.LambdaDestination(this.s3EventProcessor),
+      new s3n.SqsDestination(this.videoUploadQueue),
       {
         prefix: 'videos/', // Only trigger for files in the videos/ directory
         suffix: '.mp4'     // Only trigger for video files (add more extensions as needed)
@@ -494,7 +557,7 @@ export class BackendStack extends cdk.Stack {
     // Also trigger for other video formats
     this.s3Bucket.addEventNotification(
       s3.EventType.OBJECT_CREATED,
-      new s3n.LambdaDestination(this.s3EventProcessor),
+      new s3n.SqsDestination(this.videoUploadQueue),
       {
         prefix: 'videos/',
         suffix: '.mov'
@@ -503,7 +566,7 @@ export class BackendStack extends cdk.Stack {
 
     this.s3Bucket.addEventNotification(
       s3.EventType.OBJECT_CREATED,
-      new s3n.LambdaDestination(this.s3EventProcessor),
+      new s3n.SqsDestination(this.videoUploadQueue),
       {
         prefix: 'videos/',
         suffix: '.avi'
@@ -512,7 +575,7 @@ export class BackendStack extends cdk.Stack {
 
     this.s3Bucket.addEventNotification(
       s3.EventType.OBJECT_CREATED,
-      new s3n.LambdaDestination(this.s3EventProcessor),
+      new s3n.SqsDestination(this.videoUploadQueue),
       {
         prefix: 'videos/',
         suffix: '.mkv'
@@ -521,7 +584,7 @@ export class BackendStack extends cdk.Stack {
 
     this.s3Bucket.addEventNotification(
       s3.EventType.OBJECT_CREATED,
-      new s3n.LambdaDestination(this.s3EventProcessor),
+      new s3n.SqsDestination(this.videoUploadQueue),
       {
         prefix: 'videos/',
         suffix: '.webm'
@@ -554,6 +617,11 @@ export class BackendStack extends cdk.Stack {
       description: 'Name of the presigned URL Lambda function'
     });
 
+    new cdk.CfnOutput(this, 'VideoUploadQueueUrl', {
+      value: this.videoUploadQueue.queueUrl,
+      description: 'URL of the SQS queue buffering video upload events'
+    });
+
     new cdk.CfnOutput(this, 'S3EventProcessorName', {
       value: this.s3EventProcessor.functionName,
       description: 'Name of the S3 event processor Lambda function'